@@ -1,33 +1,254 @@
+from collections import defaultdict
+
 from django.contrib import admin
-from .models import Scholarship, ForumTopic, ForumReply,Signup
+from django.contrib.admin.views.main import ChangeList
+from django.urls import reverse
+from django.utils.html import format_html
+from django.db.models import Q
+from .models import (
+    Scholarship, ArchivedScholarship, ScholarshipStats, ScholarshipFieldCount, ForumTopic, ForumReply, Signup,
+    StudentProfile, RecomputeJob, ScholarshipRecommendation,
+)
+from .pagination import EstimatedCountPaginator
+from .recompute import enqueue_recompute
+from .search import filter_by_search, is_search_available
 
 
+class LargeTableAdmin(admin.ModelAdmin):
+    """Base for every admin here: changelists that don't COUNT(*) whole tables on each view"""
+    paginator = EstimatedCountPaginator
+    # Skips the second, unfiltered count behind "N total" on filtered pages
+    show_full_result_count = False
 
 @admin.register(Signup)
-class SignupAdmin(admin.ModelAdmin):
+class SignupAdmin(LargeTableAdmin):
     list_display = ('name', 'email')
     search_fields = ('name', 'email')
     # Ensure delete is enabled
     actions = ['delete_selected']
 
+class ScholarshipChangeList(ChangeList):
+    """
+    Attaches ScholarshipStats and the top fields of study to the page's
+    scholarships: two indexed lookups by id in the recommendations
+    database, instead of a join or an aggregate over recommendations
+    """
+    top_fields = 3
+
+    def get_results(self, request):
+        super().get_results(request)
+        ids = [scholarship.pk for scholarship in self.result_list]
+        stats = ScholarshipStats.objects.in_bulk(ids, field_name='scholarship_id')
+        top_fields = defaultdict(list)
+        for row in (ScholarshipFieldCount.objects.filter(scholarship_id__in=ids)
+                    .order_by('scholarship_id', '-recommendation_count')):
+            if len(top_fields[row.scholarship_id]) < self.top_fields:
+                top_fields[row.scholarship_id].append(row)
+        for scholarship in self.result_list:
+            scholarship.page_stats = stats.get(scholarship.pk)
+            scholarship.top_fields = top_fields.get(scholarship.pk, [])
+
 @admin.register(Scholarship)
-class ScholarshipAdmin(admin.ModelAdmin):
-    list_display = ('title', 'provider', 'amount', 'deadline', 'scholarship_type', 'education_level')
+class ScholarshipAdmin(LargeTableAdmin):
+    list_display = ('title', 'provider', 'amount', 'deadline', 'scholarship_type', 'education_level',
+                    'recommended_to', 'average_match', 'score_histogram', 'top_fields_of_study')
     list_filter = ('scholarship_type', 'education_level', 'deadline')
     search_fields = ('title', 'provider', 'description')
     date_hierarchy = 'deadline'
+    actions = ['recompute_matches']
+
+    def get_changelist(self, request, **kwargs):
+        return ScholarshipChangeList
+
+    @admin.display(description='Recommended to')
+    def recommended_to(self, obj):
+        return obj.page_stats.recommendation_count if obj.page_stats else 0
+
+    @admin.display(description='Avg. match %')
+    def average_match(self, obj):
+        return obj.page_stats.average_score if obj.page_stats else None
+
+    @admin.display(description='Scores 0-19 / 20-39 / 40-59 / 60-79 / 80+')
+    def score_histogram(self, obj):
+        if not obj.page_stats:
+            return None
+        return ' / '.join(str(count) for count in obj.page_stats.histogram)
+
+    @admin.display(description='Top fields of study')
+    def top_fields_of_study(self, obj):
+        return ', '.join(f'{row.field_of_study} ({row.recommendation_count})' for row in obj.top_fields) or None
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS5 index instead of LIKE '%term%' scans when it exists
+        if search_term and is_search_available():
+            return filter_by_search(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description='Recompute matches for selected scholarships')
+    def recompute_matches(self, request, queryset):
+        queue_recompute(self, request, RecomputeJob.SCHOLARSHIPS, queryset)
+
+def queue_recompute(model_admin, request, kind, queryset):
+    """Queue a RecomputeJob for the selected rows and link to its status page"""
+    job = enqueue_recompute(kind, queryset.values_list('pk', flat=True), requested_by=request.user.get_username())
+    url = reverse('admin:scholarship_app_recomputejob_change', args=[job.pk])
+    model_admin.message_user(request, format_html(
+        'Queued <a href="{}">recompute job #{}</a> for {} {}; recommendations update in the background.',
+        url, job.pk, len(job.target_ids), model_admin.model._meta.verbose_name_plural,
+    ))
+
+@admin.register(StudentProfile)
+class StudentProfileAdmin(LargeTableAdmin):
+    list_display = ('user', 'education_level', 'field_of_study', 'cgpa', 'updated_at')
+    list_filter = ('education_level', 'financial_aid_needed')
+    search_fields = ('user__name', 'user__email', 'field_of_study')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
+    actions = ['recompute_students']
+
+    @admin.action(description='Recompute recommendations for selected students')
+    def recompute_students(self, request, queryset):
+        queue_recompute(self, request, RecomputeJob.STUDENTS, queryset)
+
+@admin.register(RecomputeJob)
+class RecomputeJobAdmin(LargeTableAdmin):
+    """Status page for the jobs the recompute actions queue"""
+    list_display = ('__str__', 'targets', 'progress', 'pairs_scored', 'throughput', 'requested_by',
+                    'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    readonly_fields = ('kind', 'status', 'targets', 'progress', 'pairs_scored', 'throughput', 'requested_by',
+                       'created_at', 'started_at', 'heartbeat_at', 'finished_at', 'error')
+    fields = readonly_fields
+
+    @admin.display(description='Targets')
+    def targets(self, obj):
+        return len(obj.target_ids)
+
+    @admin.display(description='Progress')
+    def progress(self, obj):
+        return format_html('<progress max="100" value="{}"></progress> {}% ({} of {} students)',
+                           obj.percent_done, obj.percent_done, obj.processed, obj.total)
+
+    @admin.display(description='Pairs / s')
+    def throughput(self, obj):
+        return obj.pairs_per_second
+
+    # Written only by the admin actions and the recompute worker
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+class RecommendationChangeList(ChangeList):
+    """
+    Attaches each page's students and scholarships by id from the main
+    database: recommendations live in another database, so there is no
+    join to select_related through
+    """
+
+    def get_results(self, request):
+        super().get_results(request)
+        students = StudentProfile.objects.select_related('user').in_bulk(
+            {recommendation.student_id for recommendation in self.result_list}
+        )
+        scholarships = Scholarship.objects.only('id', 'title', 'provider').in_bulk(
+            {recommendation.scholarship_id for recommendation in self.result_list}
+        )
+        for recommendation in self.result_list:
+            recommendation.page_student = students.get(recommendation.student_id)
+            recommendation.page_scholarship = scholarships.get(recommendation.scholarship_id)
+
+@admin.register(ScholarshipRecommendation)
+class ScholarshipRecommendationAdmin(LargeTableAdmin):
+    """Read-only lookup of stored recommendations for support staff"""
+    list_display = ('id', 'student_display', 'scholarship_display', 'match_score', 'field_of_study', 'created_at')
+    # Searched by student name or email, scholarship title, or either id; see get_search_results
+    search_fields = ('student_id', 'scholarship_id')
+    ordering = ('-id',)
+    readonly_fields = ('student_display', 'scholarship_display', 'match_score', 'field_of_study', 'reason',
+                       'created_at')
+    fields = readonly_fields
+    actions = None
+    # Ids matched per side of a search; the ids go into IN (...) on the other database
+    search_match_limit = 500
+
+    def get_changelist(self, request, **kwargs):
+        return RecommendationChangeList
+
+    @admin.display(description='Student')
+    def student_display(self, obj):
+        if hasattr(obj, 'page_student'):
+            student = obj.page_student
+        else:
+            # The detail page shows a single row
+            student = StudentProfile.objects.select_related('user').filter(pk=obj.student_id).first()
+        return f'{student.user.name} <{student.user.email}>' if student else f'Deleted profile #{obj.student_id}'
+
+    @admin.display(description='Scholarship')
+    def scholarship_display(self, obj):
+        if hasattr(obj, 'page_scholarship'):
+            scholarship = obj.page_scholarship
+        else:
+            scholarship = Scholarship.objects.filter(pk=obj.scholarship_id).first()
+        return str(scholarship) if scholarship else f'Deleted scholarship #{obj.scholarship_id}'
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        if search_term.isdigit():
+            return queryset.filter(Q(student_id=search_term) | Q(scholarship_id=search_term)), False
+        student_ids = StudentProfile.objects.filter(
+            Q(user__name__icontains=search_term) | Q(user__email__icontains=search_term)
+        ).values_list('id', flat=True)[:self.search_match_limit]
+        scholarships = Scholarship.objects.all()
+        if is_search_available():
+            scholarships = filter_by_search(scholarships, search_term)
+        else:
+            scholarships = scholarships.filter(title__icontains=search_term)
+        scholarship_ids = scholarships.values_list('id', flat=True)[:self.search_match_limit]
+        return queryset.filter(Q(student_id__in=list(student_ids)) | Q(scholarship_id__in=list(scholarship_ids))), False
+
+    # Rows are written only by scoring; editing them would put ScholarshipStats out of step
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(ArchivedScholarship)
+class ArchivedScholarshipAdmin(LargeTableAdmin):
+    list_display = ('title', 'provider', 'amount', 'deadline', 'archived_at')
+    list_filter = ('scholarship_type', 'education_level')
+    search_fields = ('title', 'provider')
+    date_hierarchy = 'archived_at'
+
+    # Written only by `manage.py apply_retention`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 @admin.register(ForumTopic)
-class ForumTopicAdmin(admin.ModelAdmin):
+class ForumTopicAdmin(LargeTableAdmin):
     list_display = ('title', 'user', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('title', 'content')
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
 
 @admin.register(ForumReply)
-class ForumReplyAdmin(admin.ModelAdmin):
+class ForumReplyAdmin(LargeTableAdmin):
     list_display = ('topic', 'user', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('content',)
+    list_select_related = ('topic', 'user')
+    autocomplete_fields = ('topic', 'user')
 
 admin.site.site_header = "Vidhyasathi Administration"
 admin.site.site_title = "Vidhyasathi Admin Portal"
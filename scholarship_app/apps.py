@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ScholarshipAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'scholarship_app'
+
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .sqlite import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='scholarship_app.sqlite')
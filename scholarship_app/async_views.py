@@ -0,0 +1,152 @@
+"""
+Async versions of the read-heavy views, for ASGI deployments.
+
+They share forms, pagination and templates with views.py; only the
+database access differs. Anything the templates touch lazily (the session,
+request.user, the current student) is resolved up front, because lazy
+queries are not allowed while rendering inside the event loop.
+"""
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.http import HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .catalog import acatalog_version
+from .forms import ScholarshipApiForm
+from .http_cache import public_page
+from .models import Scholarship, ScholarshipRecommendation
+from .pagination import InvalidCursor, akeyset_paginate
+from .recommendation_engine.utils import aget_recommendations_for_profile, ensure_recommendations_exist
+from .search import ais_search_available
+from .views import (
+    API_MAX_AGE, API_PAGE_SIZE, API_STREAM_CHUNK_SIZE, SCHOLARSHIPS_PAGE_SIZE,
+    api_next_url, api_scholarships_etag, encode_jsonl, get_scholarship_filter_form,
+    render_scholarship_listing,
+)
+
+
+async def prepare_request(request):
+    """Load the session, request.user and the current student off the event loop"""
+    await request.student.aresolve()
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.student
+
+
+def async_frontend_login_required(view_func):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        student = await prepare_request(request)
+        if not student:
+            messages.error(request, "Please login to access this page.")
+            return redirect('login')
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+@public_page()
+async def home(request):
+    student = await prepare_request(request)
+    if student.profile:
+        recommendations = await aget_recommendations_for_profile(student.profile, 3)
+    else:
+        recommendations = []
+
+    return render(request, 'home.html', {'recommendations': recommendations})
+
+
+@async_frontend_login_required
+async def scholarships(request):
+    profile = request.student.profile
+
+    form = get_scholarship_filter_form(request)
+    if form is None:
+        return HttpResponseBadRequest('Invalid filters')
+
+    recommended_ids = None
+    if profile and form.cleaned_data.get('recommended'):
+        recommended_ids = [
+            scholarship_id async for scholarship_id in ScholarshipRecommendation.objects.filter(
+                student=profile,
+            ).values_list('scholarship_id', flat=True)
+        ]
+
+    search_available = await ais_search_available() if form.cleaned_data.get('q') else None
+    queryset = form.filter_queryset(Scholarship.objects.all(), recommended_ids, search_available)
+    try:
+        page = await akeyset_paginate(queryset, form.get_ordering(), form.cleaned_data.get('cursor'),
+                                      SCHOLARSHIPS_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    page_recommended_ids = set()
+    if profile and page.object_list:
+        page_recommended_ids = {
+            scholarship_id async for scholarship_id in ScholarshipRecommendation.objects.filter(
+                student=profile,
+                scholarship_id__in=[s.id for s in page.object_list],
+            ).values_list('scholarship_id', flat=True)
+        }
+
+    return render_scholarship_listing(request, form, page, page_recommended_ids)
+
+
+@async_frontend_login_required
+async def recommendations(request):
+    profile = request.student.profile
+    if profile:
+        recommendations = await aget_recommendations_for_profile(profile)
+
+        # Creating fallback recommendations is a write; keep it on the sync path
+        if not recommendations:
+            await sync_to_async(ensure_recommendations_exist)(profile)
+            recommendations = await aget_recommendations_for_profile(profile)
+    else:
+        recommendations = []
+        messages.error(request, 'Please complete your profile first to get recommendations.')
+
+    return render(request, 'recommendations.html', {'recommendations': recommendations})
+
+
+async def api_scholarships(request):
+    version = await acatalog_version()
+    etag = quote_etag(api_scholarships_etag(version, request))
+    last_modified = timegm(version[0].utctimetuple()) if version[0] else None
+
+    if request.method in ('GET', 'HEAD'):
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+    form = ScholarshipApiForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    fields = form.cleaned_data['fields']
+    queryset = form.filter_queryset(Scholarship.objects.all()).values(*fields)
+
+    if form.cleaned_data.get('format') == 'jsonl':
+        async def stream():
+            async for row in queryset.order_by('id').aiterator(chunk_size=API_STREAM_CHUNK_SIZE):
+                for line in encode_jsonl([row]):
+                    yield line
+
+        response = StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+    else:
+        try:
+            page = await akeyset_paginate(queryset, ('id',), form.cleaned_data.get('cursor'),
+                                          form.cleaned_data.get('limit') or API_PAGE_SIZE)
+        except InvalidCursor:
+            return JsonResponse({'errors': {'cursor': ['Invalid cursor']}}, status=400)
+
+        response = JsonResponse({'results': page.object_list, 'next': api_next_url(request, page)})
+
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=API_MAX_AGE)
+    return response
@@ -0,0 +1,36 @@
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .models import Scholarship
+
+
+def catalog_version():
+    """
+    Cheap version stamp for the scholarship catalog.
+
+    Returns (last_modified, row_count); the count catches deletions, which
+    don't move the maximum updated_at.
+    """
+    stats = Scholarship.objects.aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    return stats['last_modified'], stats['count']
+
+
+def format_catalog_version(version):
+    """Text form of a catalog_version() result, for storing alongside derived data"""
+    last_modified, count = version
+    return f"{last_modified.isoformat() if last_modified else '-'}:{count}"
+
+
+def next_expiry():
+    """
+    Earliest deadline among open scholarships. The set of scholarships that
+    can be recommended stays the same until the day after it, unless the
+    catalog itself changes.
+    """
+    today = timezone.now().date()
+    return Scholarship.objects.filter(deadline__gte=today).aggregate(next=Min('deadline'))['next']
+
+
+async def acatalog_version():
+    stats = await Scholarship.objects.aaggregate(last_modified=Max('updated_at'), count=Count('id'))
+    return stats['last_modified'], stats['count']
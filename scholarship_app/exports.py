@@ -0,0 +1,92 @@
+"""
+Recommendation exports for analytics.
+
+Every export is a full snapshot. Rows are read from the recommendations
+database in id order with QuerySet.iterator() inside read transactions on
+both databases, and joined, one chunk at a time, with the student and
+scholarship attributes from the main database, so memory use doesn't grow
+with the export and every row comes from a single point in time.
+
+There are no incremental exports: a refresh deletes and reinserts all of a
+student's rows, so ids say nothing about which pairs changed, and pairs
+that were dropped would leave no trace to export.
+"""
+import csv
+import json
+from contextlib import ExitStack
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+
+from .models import Scholarship, ScholarshipRecommendation, StudentProfile
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+RECOMMENDATION_FIELDS = ('id', 'student_id', 'scholarship_id', 'match_score', 'created_at')
+# Profile attributes useful for analysis; names, contact details and
+# income stay out of exports
+STUDENT_FIELDS = ('education_level', 'field_of_study', 'cgpa', 'graduation_year', 'financial_aid_needed')
+SCHOLARSHIP_FIELDS = ('title', 'provider', 'scholarship_type', 'education_level', 'amount', 'deadline')
+
+EXPORT_COLUMNS = (
+    RECOMMENDATION_FIELDS
+    + tuple(f'student_{name}' for name in STUDENT_FIELDS)
+    + tuple(f'scholarship_{name}' for name in SCHOLARSHIP_FIELDS)
+)
+
+
+def _attach(chunk):
+    students = StudentProfile.objects.in_bulk({row['student_id'] for row in chunk})
+    scholarships = Scholarship.objects.in_bulk({row['scholarship_id'] for row in chunk})
+    for row in chunk:
+        student = students.get(row['student_id'])
+        scholarship = scholarships.get(row['scholarship_id'])
+        for name in STUDENT_FIELDS:
+            row[f'student_{name}'] = getattr(student, name) if student else None
+        for name in SCHOLARSHIP_FIELDS:
+            row[f'scholarship_{name}'] = getattr(scholarship, name) if scholarship else None
+        yield row
+
+
+def export_recommendations(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield every recommendation as a dict keyed by EXPORT_COLUMNS.
+
+    The export runs inside read transactions on both databases, so it is
+    consistent even while students refresh their recommendations. Under WAL
+    that doesn't block writers.
+    """
+    rows = (ScholarshipRecommendation.objects.order_by('id')
+            .values(*RECOMMENDATION_FIELDS).iterator(chunk_size=chunk_size))
+
+    with ExitStack() as stack:
+        for model in (ScholarshipRecommendation, Scholarship):
+            stack.enter_context(transaction.atomic(using=router.db_for_read(model)))
+        while chunk := list(islice(rows, chunk_size)):
+            yield from _attach(chunk)
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows, columns=EXPORT_COLUMNS):
+    writer = csv.DictWriter(_Echo(), fieldnames=columns)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def encode_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def encode_rows(rows, fmt):
+    return encode_csv(rows) if fmt == 'csv' else encode_jsonl(rows)
@@ -0,0 +1,58 @@
+import json
+
+from django.db import models
+
+
+def as_list(value):
+    """
+    Coerce a stored eligibility list to a Python list. Accepts the legacy
+    JSON-encoded text ('["India"]', '' or garbage) as well as lists.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value else []
+        except ValueError:
+            return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return []
+
+
+class JSONListField(models.JSONField):
+    """
+    JSON array column that always holds a list.
+
+    Assigning the old JSON text form still works: it is decoded on save,
+    so existing callers that store json.dumps(...) keep behaving.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('default', list)
+        kwargs.setdefault('blank', True)
+        super().__init__(*args, **kwargs)
+
+    def from_db_value(self, value, expression, connection):
+        value = super().from_db_value(value, expression, connection)
+        if isinstance(expression, models.expressions.Col):
+            return as_list(value)
+        return value
+
+    def pre_save(self, model_instance, add):
+        value = as_list(getattr(model_instance, self.attname))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
+
+@JSONListField.register_lookup
+class HasItem(models.Lookup):
+    """field__has_item='x': the array contains the scalar x (SQLite json_each)"""
+    lookup_name = 'has_item'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        return (
+            f'EXISTS (SELECT 1 FROM json_each({lhs}) WHERE json_each.value = %s)',
+            [*lhs_params, self.rhs],
+        )
@@ -1,5 +1,9 @@
 from django import forms
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
 from . import models
+from .search import build_match_query, filter_by_search, search_rank
 
 class SignupForm(forms.ModelForm):
     confirm_password = forms.CharField(widget=forms.PasswordInput())
@@ -23,4 +27,144 @@ class SignupForm(forms.ModelForm):
 
 class LoginForm(forms.Form):
     email = forms.EmailField()
-    password = forms.CharField(widget=forms.PasswordInput())
\ No newline at end of file
+    password = forms.CharField(widget=forms.PasswordInput())
+
+class ScholarshipFilterForm(forms.Form):
+    SORT_CHOICES = [
+        ('relevance', 'Best match'),
+        ('deadline_desc', 'Deadline (latest first)'),
+        ('deadline_asc', 'Deadline (soonest first)'),
+        ('amount_desc', 'Amount (highest first)'),
+        ('amount_asc', 'Amount (lowest first)'),
+    ]
+
+    # Keyset orderings; the trailing id keeps every position unique
+    SORT_ORDERINGS = {
+        'relevance': ('search_rank', 'id'),
+        'deadline_desc': ('-deadline', '-id'),
+        'deadline_asc': ('deadline', 'id'),
+        'amount_desc': ('-amount', '-id'),
+        'amount_asc': ('amount', 'id'),
+    }
+
+    q = forms.CharField(required=False, max_length=100)
+    type = forms.ChoiceField(required=False, choices=[('all', 'All Categories')] + models.Scholarship.SCHOLARSHIP_TYPES)
+    education = forms.ChoiceField(required=False, choices=[('all', 'All Education Levels')] + models.Scholarship.EDUCATION_LEVELS)
+    min_amount = forms.DecimalField(required=False, min_value=0, max_digits=10, decimal_places=2)
+    max_amount = forms.DecimalField(required=False, min_value=0, max_digits=10, decimal_places=2)
+    deadline_within = forms.IntegerField(required=False, min_value=0)  # days from today
+    recommended = forms.BooleanField(required=False)
+    sort = forms.ChoiceField(required=False, choices=SORT_CHOICES)
+    cursor = forms.CharField(required=False)
+
+    def sort_key(self):
+        """
+        The sort in effect: searches are listed best match first unless
+        another sort was picked; without search words there is no relevance
+        """
+        sort = self.cleaned_data.get('sort')
+        searching = build_match_query(self.cleaned_data.get('q')) is not None
+        if not sort or (sort == 'relevance' and not searching):
+            return 'relevance' if searching else 'deadline_desc'
+        return sort
+
+    def get_ordering(self):
+        return self.SORT_ORDERINGS[self.sort_key()]
+
+    def filter_queryset(self, queryset, recommended_ids=None, search_available=None):
+        """Apply the cleaned filters to a Scholarship queryset; see filter_by_search for search_available"""
+        data = self.cleaned_data
+
+        if data.get('q'):
+            queryset = filter_by_search(queryset, data['q'], search_available)
+        if self.sort_key() == 'relevance':
+            queryset = queryset.annotate(search_rank=search_rank(data['q'], search_available))
+
+        if data.get('type') and data['type'] != 'all':
+            queryset = queryset.filter(scholarship_type=data['type'])
+
+        if data.get('education') and data['education'] != 'all':
+            queryset = queryset.filter(education_level=data['education'])
+
+        if data.get('min_amount') is not None:
+            queryset = queryset.filter(amount__gte=data['min_amount'])
+
+        if data.get('max_amount') is not None:
+            queryset = queryset.filter(amount__lte=data['max_amount'])
+
+        if data.get('deadline_within') is not None:
+            today = timezone.now().date()
+            queryset = queryset.filter(
+                deadline__gte=today,
+                deadline__lte=today + timedelta(days=data['deadline_within']),
+            )
+
+        if data.get('recommended'):
+            queryset = queryset.filter(id__in=recommended_ids if recommended_ids is not None else [])
+
+        return queryset
+
+
+class ScholarshipApiForm(forms.Form):
+    # Columns partners are allowed to project with ?fields=
+    API_FIELDS = (
+        'id', 'title', 'provider', 'amount', 'deadline', 'description', 'eligibility',
+        'application_process', 'website', 'scholarship_type', 'education_level', 'updated_at',
+    )
+    DEFAULT_FIELDS = ('id', 'title', 'provider', 'amount', 'deadline', 'description')
+    MAX_LIMIT = 200
+
+    fields = forms.CharField(required=False)
+    scholarship_type = forms.ChoiceField(required=False, choices=models.Scholarship.SCHOLARSHIP_TYPES)
+    education_level = forms.ChoiceField(required=False, choices=models.Scholarship.EDUCATION_LEVELS)
+    # Scholarships open to a citizenship or field: none required, or it is listed
+    citizenship = forms.CharField(required=False, max_length=100)
+    field_of_study = forms.CharField(required=False, max_length=100)
+    cursor = forms.CharField(required=False)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+    format = forms.ChoiceField(required=False, choices=[('json', 'JSON'), ('jsonl', 'JSON Lines')])
+
+    def clean_fields(self):
+        value = self.cleaned_data.get('fields')
+        if not value:
+            return self.DEFAULT_FIELDS
+
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in self.API_FIELDS]
+        if unknown:
+            raise forms.ValidationError(f"Unknown fields: {', '.join(unknown)}")
+
+        # id is always returned so clients can key their rows
+        return tuple(dict.fromkeys(['id'] + requested))
+
+    def filter_queryset(self, queryset):
+        data = self.cleaned_data
+        if data.get('scholarship_type'):
+            queryset = queryset.filter(scholarship_type=data['scholarship_type'])
+        if data.get('education_level'):
+            queryset = queryset.filter(education_level=data['education_level'])
+        if data.get('citizenship'):
+            queryset = queryset.filter(Q(citizenship_requirements=[])
+                                       | Q(citizenship_requirements__has_item=data['citizenship']))
+        if data.get('field_of_study'):
+            queryset = queryset.filter(Q(field_of_study_requirements=[])
+                                       | Q(field_of_study_requirements__has_item=data['field_of_study']))
+        return queryset
+
+
+class ScholarshipSyncForm(forms.Form):
+    MAX_LIMIT = 500
+
+    since = forms.CharField(required=False)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+
+
+class ScholarshipSearchForm(forms.Form):
+    MAX_LIMIT = 50
+
+    q = forms.CharField(max_length=100)
+    limit = forms.IntegerField(required=False, min_value=1, max_value=MAX_LIMIT)
+
+
+class RecommendationExportForm(forms.Form):
+    format = forms.ChoiceField(required=False, choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')])
@@ -0,0 +1,116 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+# How long shared caches (CDN, proxies) may reuse an anonymous page
+PUBLIC_PAGE_MAX_AGE = 60
+# How long this process keeps a rendered copy; bounds staleness of
+# time-relative text such as "posted 2 hours ago"
+PUBLIC_PAGE_TTL = 300
+
+
+def is_anonymous_safe(request):
+    """True when the response can't depend on who is asking"""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.session.get('user_id') or request.user.is_authenticated:
+        return False
+    # A pending flash message is rendered into the page once
+    if request.COOKIES.get(CookieStorage.cookie_name) or request.session.get('_messages'):
+        return False
+    return True
+
+
+def _is_shareable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # Pages embedding a CSRF token are tied to the visitor's cookie
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _finish(request, response, etag):
+    not_modified = get_conditional_response(request, etag=etag, response=response)
+    if not_modified is not None:
+        response = not_modified
+    response.headers['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=PUBLIC_PAGE_MAX_AGE)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def _page_key(view_func, request, version):
+    stamp = f"{view_func.__module__}.{view_func.__name__}:{request.get_full_path()}:{version() if version else ''}"
+    return 'page:' + hashlib.sha1(stamp.encode()).hexdigest()
+
+
+def _store(request, response, key):
+    """Keep a shareable response for later requests; returns the response to send"""
+    if not _is_shareable(request, response):
+        patch_cache_control(response, private=True)
+        return response
+
+    etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+    caches['pages'].set(key, (etag, response.content, response['Content-Type']), PUBLIC_PAGE_TTL)
+    return _finish(request, response, etag)
+
+
+def _from_cache(request, cached):
+    etag, content, content_type = cached
+    return _finish(request, HttpResponse(content, content_type=content_type), etag)
+
+
+def public_page(version=None):
+    """
+    Cache anonymous renders of a view and answer conditional GETs.
+
+    ``version`` is an optional callable returning a stamp of the data the
+    page shows; rendered copies are keyed on it, so data changes are
+    picked up on the next request. The ETag is a hash of the rendered
+    bytes, and a matching If-None-Match is answered with 304 from the
+    stored copy without rendering. Logged-in visitors bypass all of this
+    and get ``Cache-Control: private``. Works on sync and async views.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                # The session, request.user and version() may all query the database
+                if not await sync_to_async(is_anonymous_safe)(request):
+                    response = await view_func(request, *args, **kwargs)
+                    patch_cache_control(response, private=True)
+                    return response
+
+                key = await sync_to_async(_page_key)(view_func, request, version)
+                cached = await caches['pages'].aget(key)
+                if cached is not None:
+                    return _from_cache(request, cached)
+
+                response = await view_func(request, *args, **kwargs)
+                return await sync_to_async(_store)(request, response, key)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not is_anonymous_safe(request):
+                response = view_func(request, *args, **kwargs)
+                patch_cache_control(response, private=True)
+                return response
+
+            key = _page_key(view_func, request, version)
+            cached = caches['pages'].get(key)
+            if cached is not None:
+                return _from_cache(request, cached)
+
+            response = view_func(request, *args, **kwargs)
+            return _store(request, response, key)
+        return wrapper
+    return decorator
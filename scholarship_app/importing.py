@@ -0,0 +1,217 @@
+"""
+Scholarship feed import.
+
+Rows are read lazily from CSV or JSON Lines files, normalized and validated
+in batches, and upserted on the (title, provider) natural key with one
+INSERT ... ON CONFLICT DO UPDATE per batch. Only the current batch is held
+in memory, whatever the file size.
+"""
+import csv
+import json
+import re
+from datetime import date, datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+
+from .fields import JSONListField
+from .models import Scholarship
+
+IMPORT_FIELDS = (
+    'title', 'provider', 'amount', 'deadline', 'description', 'eligibility',
+    'application_process', 'website', 'scholarship_type', 'education_level',
+    'min_cgpa', 'max_age', 'min_age', 'citizenship_requirements',
+    'field_of_study_requirements', 'minority_preferences', 'disability_preferences',
+    'income_max', 'income_min',
+)
+UNIQUE_FIELDS = ('title', 'provider')
+# created_at keeps the first import's time; updated_at moves so delta sync
+# and the catalog version see the change
+UPDATE_FIELDS = tuple(name for name in IMPORT_FIELDS if name not in UNIQUE_FIELDS) + ('updated_at',)
+
+FORMATS = ('csv', 'jsonl')
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y')
+# "₹ 1,25,000", "Rs. 5000", "INR 12000.50"
+_CURRENCY_RE = re.compile(r'^(?:₹|rs\.?|inr)\s*', re.IGNORECASE)
+# Separators for list cells that aren't JSON arrays: "India; Nepal" or "India|Nepal"
+_LIST_SPLIT_RE = re.compile(r'\s*[;|]\s*')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def detect_format(path):
+    for fmt in FORMATS:
+        if str(path).lower().endswith('.' + fmt):
+            return fmt
+    if str(path).lower().endswith('.json'):
+        return 'jsonl'
+    raise ImportFormatError(f"Can't tell the format of {path}; pass one of {', '.join(FORMATS)}")
+
+
+def read_rows(path, fmt):
+    """Yield (line_number, row dict) pairs without loading the file"""
+    # utf-8-sig drops the byte order mark spreadsheet exports start with
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield line_number, ValidationError(f'Invalid JSON: {exc}')
+                    continue
+                if not isinstance(row, dict):
+                    row = ValidationError('Expected a JSON object')
+                yield line_number, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _choice(value, choices):
+    """Accept a choice's value or its label, in any case"""
+    lookup = {}
+    for choice, label in choices:
+        lookup[choice.lower()] = choice
+        lookup[label.lower()] = choice
+    return lookup.get(value.strip().lower(), value)
+
+
+def _list(value):
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ValidationError('Invalid JSON list')
+        else:
+            value = _LIST_SPLIT_RE.split(value) if value else []
+    if not isinstance(value, (list, tuple)):
+        raise ValidationError('Expected a list')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _date(value):
+    if isinstance(value, str):
+        value = value.strip()
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                pass
+    # ISO dates and anything else are left to DateField validation
+    return value
+
+
+def _number(value):
+    if isinstance(value, str):
+        value = _CURRENCY_RE.sub('', value.strip()).replace(',', '')
+    return value
+
+
+def normalize_row(row):
+    """Clean one feed row into field values; raises ValidationError with a message per field"""
+    values, errors = {}, {}
+    for name in IMPORT_FIELDS:
+        field = Scholarship._meta.get_field(name)
+        value = row.get(name)
+        if isinstance(value, str) and not value.strip() and field.null:
+            value = None
+        try:
+            if value is None:
+                pass
+            elif isinstance(field, JSONListField):
+                value = _list(value)
+            elif field.choices:
+                value = _choice(str(value), field.choices)
+            elif field.get_internal_type() == 'DateField' and not isinstance(value, date):
+                value = _date(value)
+            elif field.get_internal_type() in ('DecimalField', 'IntegerField'):
+                value = _number(value)
+            elif isinstance(value, str):
+                value = value.strip()
+        except ValidationError as exc:
+            errors[name] = exc.messages
+            continue
+        if value is None and not field.null:
+            value = field.get_default()
+        values[name] = value
+    if errors:
+        raise ValidationError(errors)
+    return values
+
+
+def build_scholarships(rows):
+    """
+    Validate a batch of (line_number, row) pairs.
+
+    Returns (scholarships, errors), errors being (line_number, message)
+    pairs. A later row with the same title and provider replaces an
+    earlier one in the batch.
+    """
+    scholarships, errors = {}, []
+    for line_number, row in rows:
+        try:
+            if isinstance(row, ValidationError):
+                raise row
+            scholarship = Scholarship(**normalize_row(row))
+            # Uniqueness is what the upsert resolves, so it isn't an error here
+            scholarship.full_clean(exclude=['created_at', 'updated_at'], validate_unique=False,
+                                   validate_constraints=False)
+        except ValidationError as exc:
+            if hasattr(exc, 'error_dict'):
+                message = '; '.join(f"{field}: {' '.join(messages)}"
+                                    for field, messages in exc.message_dict.items())
+            else:
+                message = ' '.join(exc.messages)
+            errors.append((line_number, message))
+            continue
+        scholarships[(scholarship.title, scholarship.provider)] = scholarship
+    return list(scholarships.values()), errors
+
+
+def upsert_scholarships(scholarships, dry_run=False):
+    """
+    Insert new scholarships and update changed ones in a single transaction.
+
+    Rows identical to what's stored are skipped, so re-importing a feed
+    doesn't move updated_at (and with it sync clients and the catalog
+    version). Returns (created, updated, unchanged) counts.
+    """
+    using = router.db_for_write(Scholarship)
+    titles = {scholarship.title for scholarship in scholarships}
+    existing = {
+        (current.title, current.provider): current
+        for current in Scholarship.objects.using(using).filter(title__in=titles).only(*IMPORT_FIELDS)
+    }
+    changed, created = [], 0
+    for scholarship in scholarships:
+        current = existing.get((scholarship.title, scholarship.provider))
+        if current is None:
+            created += 1
+        elif all(getattr(current, name) == getattr(scholarship, name) for name in UPDATE_FIELDS[:-1]):
+            continue
+        changed.append(scholarship)
+
+    # The comparison reads outside the transaction: under WAL a transaction
+    # that reads before writing fails outright if another write commits in
+    # between. The upsert is correct either way; only the counts may lag.
+    if changed and not dry_run:
+        with transaction.atomic(using=using):
+            Scholarship.objects.using(using).bulk_create(
+                changed, update_conflicts=True,
+                unique_fields=UNIQUE_FIELDS, update_fields=UPDATE_FIELDS,
+            )
+    return created, len(changed) - created, len(scholarships) - len(changed)
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from scholarship_app.retention import (
+    archive_expired_scholarships, clear_expired_sessions, prune_sync_tombstones,
+    purge_orphaned_recommendations,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive expired scholarships, purge recommendations pointing at missing scholarships or '
+        'students, clear expired sessions and prune old sync tombstones, in small batches. '
+        'Meant to run daily from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per delete transaction')
+        parser.add_argument('--pause', type=float, default=0.05,
+                            help='Seconds to sleep between batches so other writers get the lock')
+        parser.add_argument('--grace-days', type=int, default=settings.SCHOLARSHIP_ARCHIVE_GRACE_DAYS,
+                            help='Archive scholarships whose deadline passed more than this many days ago')
+
+    def handle(self, *args, **options):
+        batch_size, pause = options['batch_size'], options['pause']
+        if batch_size < 1 or pause < 0 or options['grace_days'] < 0:
+            raise CommandError('--batch-size must be >= 1, --pause and --grace-days >= 0')
+
+        before = timezone.now().date() - timedelta(days=options['grace_days'])
+        steps = [
+            ('scholarships archived', lambda: archive_expired_scholarships(before, batch_size, pause)),
+            ('orphaned recommendation and stats rows deleted', lambda: purge_orphaned_recommendations(batch_size, pause)),
+            ('expired sessions deleted', lambda: clear_expired_sessions(batch_size, pause)),
+            ('sync tombstones pruned', lambda: prune_sync_tombstones(batch_size, pause)),
+        ]
+        for label, step in steps:
+            started = time.monotonic()
+            count = step()
+            self.stdout.write(f'{count} {label} in {time.monotonic() - started:.1f}s')
+        self.stdout.write(self.style.SUCCESS('Retention complete'))
@@ -0,0 +1,152 @@
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+from django.test.utils import override_settings
+
+from scholarship_app.models import Scholarship, ScholarshipRecommendation, StudentProfile
+from scholarship_app.recommendation_engine.utils import calculate_match_score, generate_recommendation_reason
+
+BENCHMARK_ALIAS = 'sqlite_benchmark'
+BENCHMARK_RECOMMENDATIONS_ALIAS = 'sqlite_benchmark_recommendations'
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent recommendation reads and refresh writes against copies of the main and '
+        'recommendations databases, once with SQLite defaults and once with settings.SQLITE_PRAGMAS, '
+        'and compare throughput, latency and "database is locked" errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+        parser.add_argument('--writers', type=int, default=2, help='Threads rescoring students')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per profile')
+        parser.add_argument('--profile', choices=['both', 'default', 'tuned'], default='both')
+
+    def handle(self, *args, **options):
+        sources = {
+            BENCHMARK_ALIAS: settings.DATABASES['default'],
+            BENCHMARK_RECOMMENDATIONS_ALIAS: settings.DATABASES[settings.RECOMMENDATIONS_DATABASE],
+        }
+        if any(source['ENGINE'] != 'django.db.backends.sqlite3' for source in sources.values()):
+            raise CommandError('The benchmark needs SQLite databases')
+
+        student_ids = list(StudentProfile.objects.values_list('id', flat=True))
+        if not student_ids:
+            raise CommandError('No student profiles to score; create one first')
+
+        profiles = ['default', 'tuned'] if options['profile'] == 'both' else [options['profile']]
+        workdir = tempfile.mkdtemp(prefix='sqlite-benchmark-')
+        try:
+            for profile in profiles:
+                paths = {}
+                for alias, source in sources.items():
+                    paths[alias] = os.path.join(workdir, f'{profile}-{alias}.sqlite3')
+                    self.copy_database(source['NAME'], paths[alias], wal=profile == 'tuned')
+                pragmas = settings.SQLITE_PRAGMAS if profile == 'tuned' else {}
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    results = self.run(paths, student_ids, options)
+                self.report(profile, results)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def copy_database(self, source_path, target_path, wal):
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+            # The journal mode is stored in the file, so set it explicitly
+            target.execute(f"PRAGMA journal_mode = {'wal' if wal else 'delete'}")
+        finally:
+            target.close()
+            source.close()
+
+    def run(self, paths, student_ids, options):
+        for alias, path in paths.items():
+            connections.settings[alias] = {**connections.settings['default'], 'NAME': path}
+        scholarships = list(Scholarship.objects.using(BENCHMARK_ALIAS).all())
+        profiles = StudentProfile.objects.using(BENCHMARK_ALIAS).in_bulk(student_ids)
+        connections[BENCHMARK_ALIAS].close()
+
+        deadline = time.monotonic() + options['duration']
+        results = {'read': [], 'write': [], 'locked': 0}
+        lock = threading.Lock()
+
+        def read():
+            student_id = random.choice(student_ids)
+            recommendations = list(
+                ScholarshipRecommendation.objects.using(BENCHMARK_RECOMMENDATIONS_ALIAS)
+                .filter(student_id=student_id).order_by('-match_score')[:10]
+            )
+            Scholarship.objects.using(BENCHMARK_ALIAS).in_bulk([r.scholarship_id for r in recommendations])
+            list(Scholarship.objects.using(BENCHMARK_ALIAS).order_by('-deadline', '-id')[:25])
+
+        def write():
+            profile = profiles[random.choice(student_ids)]
+            recommendations = []
+            for scholarship in scholarships:
+                score = calculate_match_score(profile, scholarship)
+                if score > 20:
+                    recommendations.append(ScholarshipRecommendation(
+                        student=profile, scholarship=scholarship, match_score=score,
+                        reason=generate_recommendation_reason(profile, scholarship, score),
+                    ))
+            with transaction.atomic(using=BENCHMARK_RECOMMENDATIONS_ALIAS):
+                manager = ScholarshipRecommendation.objects.using(BENCHMARK_RECOMMENDATIONS_ALIAS)
+                manager.filter(student=profile).delete()
+                manager.bulk_create(recommendations)
+
+        def worker(kind, operation):
+            try:
+                while time.monotonic() < deadline:
+                    started = time.monotonic()
+                    try:
+                        operation()
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        with lock:
+                            results['locked'] += 1
+                        continue
+                    with lock:
+                        results[kind].append(time.monotonic() - started)
+            finally:
+                for alias in paths:
+                    connections[alias].close()
+
+        threads = [threading.Thread(target=worker, args=('read', read)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write', write)) for _ in range(options['writers'])]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.monotonic() - started
+
+        for alias in paths:
+            del connections.settings[alias]
+        return results
+
+    def report(self, profile, results):
+        elapsed = results['elapsed']
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{profile} pragmas'))
+        for kind in ('read', 'write'):
+            latencies = sorted(results[kind])
+            if not latencies:
+                self.stdout.write(f'  {kind}s: none completed')
+                continue
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            self.stdout.write(
+                f'  {kind}s: {len(latencies) / elapsed:.1f}/s, '
+                f'p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95:.1f} ms'
+            )
+        self.stdout.write(f"  database is locked errors: {results['locked']}")
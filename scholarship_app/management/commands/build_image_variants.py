@@ -0,0 +1,58 @@
+import os
+
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.core.management.base import BaseCommand, CommandError
+from scholarship_app.storage import IMAGE_EXTENSIONS, IMAGE_VARIANT_WIDTHS, variant_name, variants_root
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class Command(BaseCommand):
+    help = 'Build resized WebP variants of static images for srcset (run before collectstatic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quality', type=int, default=80, help='WebP quality (0-100)')
+        parser.add_argument('--force', action='store_true', help='Rebuild variants that are up to date')
+
+    def handle(self, *args, **options):
+        if Image is None:
+            raise CommandError('Pillow is required to build image variants.')
+
+        output_root = variants_root()
+        built = skipped = 0
+
+        for path, storage in FileSystemFinder().list([]):
+            source = storage.path(path)
+            if os.path.commonpath([source, output_root]) == output_root:
+                continue
+            if not path.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            path = path.replace(os.sep, '/')
+            with Image.open(source) as image:
+                image.load()
+                # Never upscale; srcset widths must be the real pixel widths
+                widths = [width for width in IMAGE_VARIANT_WIDTHS if width < image.width]
+
+                for width in widths:
+                    target = os.path.join(output_root, *variant_name(path, width).split('/'))
+                    if (not options['force'] and os.path.exists(target)
+                            and os.path.getmtime(target) >= os.path.getmtime(source)):
+                        skipped += 1
+                        continue
+
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    height = round(image.height * width / image.width)
+                    image.resize((width, height), Image.LANCZOS).save(
+                        target, 'WEBP', quality=options['quality'], method=6,
+                    )
+                    built += 1
+                    self.stdout.write(
+                        f'{path} -> {variant_name(path, width)} '
+                        f'({os.path.getsize(source) // 1024} KiB -> {os.path.getsize(target) // 1024} KiB)'
+                    )
+
+        self.stdout.write(self.style.SUCCESS(f'Built {built} image variants ({skipped} already up to date).'))
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scholarship_app.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, encode_rows, export_recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream a consistent snapshot of every recommendation, with student and scholarship '
+        'attributes, as CSV or JSON Lines.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help='File to write; defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be >= 1')
+
+        rows = export_recommendations(chunk_size=options['chunk_size'])
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for chunk in encode_rows(counted(rows), options['format']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        # stdout may be the export itself, so the summary goes to stderr
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} recommendations'))
@@ -0,0 +1,60 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from scholarship_app.importing import (
+    FORMATS, ImportFormatError, batched, build_scholarships, detect_format, read_rows, upsert_scholarships,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Import scholarships from a CSV or JSON Lines feed, upserting on (title, provider). '
+        'Invalid rows are reported and skipped; each batch is written in its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV with a header row, or one JSON object per line')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and count without writing')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.isfile(path):
+            raise CommandError(f'No such file: {path}')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        try:
+            fmt = options['format'] or detect_format(path)
+        except ImportFormatError as exc:
+            raise CommandError(exc)
+
+        started = time.monotonic()
+        totals = {'created': 0, 'updated': 0, 'unchanged': 0, 'invalid': 0, 'failed': 0}
+        for batch in batched(read_rows(path, fmt), options['batch_size']):
+            scholarships, errors = build_scholarships(batch)
+            for line_number, message in errors:
+                self.stderr.write(f'Line {line_number}: {message}')
+            totals['invalid'] += len(errors)
+            if not scholarships:
+                continue
+
+            try:
+                created, updated, unchanged = upsert_scholarships(scholarships, dry_run=options['dry_run'])
+            except DatabaseError as exc:
+                self.stderr.write(self.style.ERROR(
+                    f'Lines {batch[0][0]}-{batch[-1][0]}: batch not imported: {exc}'
+                ))
+                totals['failed'] += len(scholarships)
+                continue
+            totals['created'] += created
+            totals['updated'] += updated
+            totals['unchanged'] += unchanged
+
+        summary = ', '.join(f'{count} {name}' for name, count in totals.items())
+        prefix = 'Dry run: ' if options['dry_run'] else ''
+        style = self.style.WARNING if totals['invalid'] or totals['failed'] else self.style.SUCCESS
+        self.stdout.write(style(f'{prefix}{summary} in {time.monotonic() - started:.1f}s'))
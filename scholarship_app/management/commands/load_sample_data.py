@@ -1,6 +1,5 @@
 from django.core.management.base import BaseCommand
-from scholarship_app.models import Scholarship
-import json
+from scholarship_app.importing import build_scholarships, upsert_scholarships
 from datetime import datetime, timedelta
 
 class Command(BaseCommand):
@@ -19,14 +18,14 @@ class Command(BaseCommand):
                 'application_process': 'Apply through State/UT liaison officers. Two-stage exam.',
                 'website': 'https://ncert.nic.in/national-talent-examination.php',
                 'scholarship_type': 'merit',
-                'education_level': 'school',
+                'education_level': 'high_school',
                 'min_cgpa': '6.00',
                 'max_age': 18,
                 'min_age': 14,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Kishore Vaigyanik Protsahan Yojana (KVPY)',
@@ -38,14 +37,14 @@ class Command(BaseCommand):
                 'application_process': 'Online application followed by aptitude test and interview.',
                 'website': 'https://kvpy.iisc.ac.in/',
                 'scholarship_type': 'merit',
-                'education_level': 'school',
+                'education_level': 'high_school',
                 'min_cgpa': '6.00',
                 'max_age': 20,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Science", "Mathematics"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Science", "Mathematics"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Central Sector Scheme of Scholarships',
@@ -61,10 +60,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '800000.00',
             },
             {
@@ -81,10 +80,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '600000.00',
             },
             {
@@ -101,10 +100,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Engineering", "Technology", "Architecture", "Pharmacy"]',
-                'minority_preferences': '["Women in STEM"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Engineering", "Technology", "Architecture", "Pharmacy"],
+                'minority_preferences': ["Women in STEM"],
+                'disability_preferences': [],
                 'income_max': '800000.00',
             },
             {
@@ -121,10 +120,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Engineering", "Technology", "Architecture", "Pharmacy"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '["Physically Disabled", "Hearing Impairment", "Visual Impairment"]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Engineering", "Technology", "Architecture", "Pharmacy"],
+                'minority_preferences': [],
+                'disability_preferences': ["Physically Disabled", "Hearing Impairment", "Visual Impairment"],
                 'income_max': '800000.00',
             },
             {
@@ -141,10 +140,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.50',
                 'max_age': 40,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Maulana Azad National Fellowship',
@@ -160,10 +159,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.50',
                 'max_age': 40,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Minority Community"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Minority Community"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Post Matric Scholarship for SC/ST/OBC',
@@ -179,10 +178,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.50',
                 'max_age': 30,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste", "Scheduled Tribe", "Other Backward Classes"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste", "Scheduled Tribe", "Other Backward Classes"],
+                'disability_preferences': [],
                 'income_max': '250000.00',
             },
             {
@@ -195,14 +194,14 @@ class Command(BaseCommand):
                 'application_process': 'Online application through National Scholarship Portal (NSP).',
                 'website': 'https://scholarships.gov.in/',
                 'scholarship_type': 'minority',
-                'education_level': 'school',
+                'education_level': 'high_school',
                 'min_cgpa': '5.00',
                 'max_age': 16,
                 'min_age': 10,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Minority Community"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Minority Community"],
+                'disability_preferences': [],
                 'income_max': '100000.00',
             },
             {
@@ -219,10 +218,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.50',
                 'max_age': 50,
                 'min_age': 30,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Dr. Ambedkar Post Matric Scholarship for EBC',
@@ -238,10 +237,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.00',
                 'max_age': 30,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '100000.00',
             },
             {
@@ -258,10 +257,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 30,
                 'min_age': 20,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Women"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Women"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Rajiv Gandhi National Fellowship for SC/ST',
@@ -277,10 +276,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 40,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste", "Scheduled Tribe"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste", "Scheduled Tribe"],
+                'disability_preferences': [],
             },
 
             # ===== PRIVATE & CORPORATE SCHOLARSHIPS =====
@@ -298,10 +297,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '400000.00',
             },
             {
@@ -318,10 +317,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 30,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'JN Tata Endowment Scholarship',
@@ -337,10 +336,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 45,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'L’Oréal India For Young Women in Science Scholarship',
@@ -356,10 +355,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 19,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Science"]',
-                'minority_preferences': '["Women in STEM"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Science"],
+                'minority_preferences': ["Women in STEM"],
+                'disability_preferences': [],
                 'income_max': '400000.00',
             },
             {
@@ -376,10 +375,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 28,
                 'min_age': 21,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Science", "Technology", "Engineering", "Mathematics"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Science", "Technology", "Engineering", "Mathematics"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'K.C. Mahindra Scholarships for Post-Graduate Studies Abroad',
@@ -395,10 +394,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 30,
                 'min_age': 22,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'HDFC Educational Crisis Scholarship',
@@ -414,10 +413,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.00',
                 'max_age': 25,
                 'min_age': 6,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'IBM STEM for Girls Scholarship',
@@ -429,14 +428,14 @@ class Command(BaseCommand):
                 'application_process': 'Nomination by school/application through program portal.',
                 'website': 'https://www.ibm.com/ibm/',
                 'scholarship_type': 'minority',
-                'education_level': 'school',
+                'education_level': 'high_school',
                 'min_cgpa': '6.00',
                 'max_age': 18,
                 'min_age': 14,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Science", "Mathematics"]',
-                'minority_preferences': '["Women in STEM"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Science", "Mathematics"],
+                'minority_preferences': ["Women in STEM"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Tata Capital Pankh Scholarship',
@@ -452,10 +451,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Women"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Women"],
+                'disability_preferences': [],
                 'income_max': '600000.00',
             },
             {
@@ -472,10 +471,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '1500000.00',
             },
             {
@@ -492,10 +491,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 14,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '300000.00',
             },
             {
@@ -512,10 +511,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '200000.00',
             },
             {
@@ -532,10 +531,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 22,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '300000.00',
             },
             {
@@ -552,10 +551,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 16,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '200000.00',
             },
                         {
@@ -572,10 +571,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.50',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Mass Media", "Journalism", "Communications"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Mass Media", "Journalism", "Communications"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'INSPIRE Scholarship for Higher Education (SHE)',
@@ -591,10 +590,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Physics", "Chemistry", "Biology", "Mathematics"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Physics", "Chemistry", "Biology", "Mathematics"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Sarla Devi Scholarship',
@@ -610,10 +609,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Women"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Women"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Bihar Student Credit Card Scheme',
@@ -629,10 +628,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '500000.00',
             },
             {
@@ -649,10 +648,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.00',
                 'max_age': 30,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Minority Community"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Minority Community"],
+                'disability_preferences': [],
             },
             {
                 'title': 'Mumbai University Scholarship for SC/ST',
@@ -668,10 +667,10 @@ class Command(BaseCommand):
                 'min_cgpa': '4.50',
                 'max_age': 30,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste", "Scheduled Tribe"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste", "Scheduled Tribe"],
+                'disability_preferences': [],
             },
             {
                 'title': 'IIT Bombay Scholarship for SC/ST',
@@ -687,10 +686,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste", "Scheduled Tribe"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste", "Scheduled Tribe"],
+                'disability_preferences': [],
             },
             {
                 'title': 'IIM Ahmedabad Need-Based Scholarship',
@@ -706,10 +705,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 35,
                 'min_age': 21,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'AIIMS Scholarship for MBBS Students',
@@ -725,10 +724,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.00',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Medicine"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Medicine"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'NIT Trichy Scholarship for Toppers',
@@ -744,10 +743,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'BITS Pilani Merit Scholarship',
@@ -763,10 +762,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'VIT Chancellor’s Scholarship',
@@ -782,10 +781,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'SRM University Merit Scholarship',
@@ -801,10 +800,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Manipal University Scholarship',
@@ -820,10 +819,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Amity University Scholarship',
@@ -839,10 +838,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'LPU Scholarship',
@@ -858,10 +857,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Christ University Scholarship',
@@ -877,10 +876,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '500000.00',
             },
             {
@@ -897,10 +896,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '600000.00',
             },
             {
@@ -917,10 +916,10 @@ class Command(BaseCommand):
                 'min_cgpa': '7.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'OP Jindal Engineering & Management Scholarship',
@@ -936,10 +935,10 @@ class Command(BaseCommand):
                 'min_cgpa': '9.00',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Engineering", "Management"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Engineering", "Management"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'Shiv Nadar University Scholarship',
@@ -955,10 +954,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.50',
                 'max_age': 22,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '800000.00',
             },
             {
@@ -975,10 +974,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.50',
                 'max_age': 35,
                 'min_age': 21,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'TISS Scholarship for SC/ST',
@@ -994,10 +993,10 @@ class Command(BaseCommand):
                 'min_cgpa': '5.50',
                 'max_age': 35,
                 'min_age': 21,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '[]',
-                'minority_preferences': '["Scheduled Caste", "Scheduled Tribe"]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': [],
+                'minority_preferences': ["Scheduled Caste", "Scheduled Tribe"],
+                'disability_preferences': [],
             },
             {
                 'title': 'ISI Kolkata Scholarship',
@@ -1013,10 +1012,10 @@ class Command(BaseCommand):
                 'min_cgpa': '8.00',
                 'max_age': 30,
                 'min_age': 21,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Statistics", "Mathematics", "Computer Science"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Statistics", "Mathematics", "Computer Science"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'NLSIU Bangalore Scholarship',
@@ -1032,10 +1031,10 @@ class Command(BaseCommand):
                 'min_cgpa': '6.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Law"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Law"],
+                'minority_preferences': [],
+                'disability_preferences': [],
             },
             {
                 'title': 'NLU Delhi Scholarship',
@@ -1051,30 +1050,20 @@ class Command(BaseCommand):
                 'min_cgpa': '7.50',
                 'max_age': 25,
                 'min_age': 17,
-                'citizenship_requirements': '["India"]',
-                'field_of_study_requirements': '["Law"]',
-                'minority_preferences': '[]',
-                'disability_preferences': '[]',
+                'citizenship_requirements': ["India"],
+                'field_of_study_requirements': ["Law"],
+                'minority_preferences': [],
+                'disability_preferences': [],
                 'income_max': '500000.00',
             },
         ]
 
-        for data in scholarships:
-            # Handle optional fields gracefully
-            defaults = {k: v for k, v in data.items() if k not in ['income_max', 'income_min']}
-            if 'income_max' in data:
-                defaults['income_max'] = data['income_max']
-            if 'income_min' in data:
-                defaults['income_min'] = data['income_min']
-
-            scholarship, created = Scholarship.objects.update_or_create(
-                title=data['title'],
-                defaults=defaults
-            )
-
-            if created:
-                self.stdout.write(self.style.SUCCESS(f'Created scholarship: {data["title"]}'))
-            else:
-                self.stdout.write(self.style.SUCCESS(f'Updated scholarship: {data["title"]}'))
+        objects, errors = build_scholarships(enumerate(scholarships, start=1))
+        for number, message in errors:
+            self.stderr.write(f'Sample {number}: {message}')
+        created, updated, unchanged = upsert_scholarships(objects)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created}, updated {updated}, left {unchanged} scholarships unchanged'
+        ))
 
         self.stdout.write(self.style.SUCCESS('Successfully loaded 50+ real Indian scholarship samples!'))
\ No newline at end of file
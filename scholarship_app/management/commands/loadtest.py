@@ -0,0 +1,116 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Hold many concurrent (optionally slow-reading) connections against a running server '
+        'and report throughput and latency. Run it once against the WSGI deployment, e.g. '
+        '"gunicorn vidhyasathi_project.wsgi -w 2 --threads 4", and once against ASGI with '
+        'async views, e.g. "VIDHYASATHI_ASYNC_VIEWS=1 uvicorn vidhyasathi_project.asgi:application '
+        '--workers 2", using the same --connections and --slow-read to compare capacity.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='e.g. http://127.0.0.1:8000/api/scholarships/')
+        parser.add_argument('--connections', type=int, default=100, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run')
+        parser.add_argument('--slow-read', type=float, default=0.0,
+                            help='Seconds to pause between 4KB reads, simulating slow mobile links')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--cookie', default='', help='Cookie header, e.g. "sessionid=..."')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http' or not url.hostname:
+            raise CommandError('Only plain http:// URLs are supported')
+
+        results = asyncio.run(self.run(url, options))
+        self.report(results, options)
+
+    async def run(self, url, options):
+        path = url.path or '/'
+        if url.query:
+            path += '?' + url.query
+
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {url.netloc}\r\n'
+            'Connection: close\r\n'
+            'Accept-Encoding: identity\r\n'
+            + (f'Cookie: {options["cookie"]}\r\n' if options['cookie'] else '')
+            + '\r\n'
+        ).encode()
+
+        deadline = time.monotonic() + options['duration']
+        results = {'latencies': [], 'statuses': {}, 'errors': 0, 'bytes': 0}
+
+        async def client():
+            while time.monotonic() < deadline:
+                started = time.monotonic()
+                try:
+                    status, size = await asyncio.wait_for(
+                        self.fetch(url.hostname, url.port or 80, request, options['slow_read']),
+                        options['timeout'],
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    results['errors'] += 1
+                    continue
+                results['latencies'].append(time.monotonic() - started)
+                results['statuses'][status] = results['statuses'].get(status, 0) + 1
+                results['bytes'] += size
+
+        started = time.monotonic()
+        await asyncio.gather(*(client() for _ in range(options['connections'])))
+        results['elapsed'] = time.monotonic() - started
+        return results
+
+    async def fetch(self, host, port, request, slow_read):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            parts = status_line.split()
+            if len(parts) < 2:
+                raise ValueError('Malformed response')
+            size = len(status_line)
+
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if slow_read:
+                    await asyncio.sleep(slow_read)
+
+            return int(parts[1]), size
+        finally:
+            writer.close()
+
+    def report(self, results, options):
+        latencies = sorted(results['latencies'])
+        completed = len(latencies)
+        elapsed = results['elapsed']
+
+        self.stdout.write(f"Connections: {options['connections']}, duration: {elapsed:.1f}s, "
+                          f"slow read: {options['slow_read']}s")
+        self.stdout.write(f"Completed: {completed}, errors: {results['errors']}, "
+                          f"statuses: {dict(sorted(results['statuses'].items()))}")
+        if not completed:
+            self.stdout.write(self.style.ERROR('No requests completed.'))
+            return
+
+        def percentile(p):
+            return latencies[min(completed - 1, int(completed * p))] * 1000
+
+        self.stdout.write(f"Throughput: {completed / elapsed:.1f} req/s, "
+                          f"{results['bytes'] / elapsed / 1024:.1f} KiB/s")
+        self.stdout.write(f"Latency ms: p50 {percentile(0.5):.1f}, p95 {percentile(0.95):.1f}, "
+                          f"p99 {percentile(0.99):.1f}, mean {statistics.mean(latencies) * 1000:.1f}")
+        self.stdout.write(self.style.SUCCESS('Load test finished.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from scholarship_app.models import Scholarship
+from scholarship_app.search import rebuild_search_index, FTS_TABLE
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index over scholarships'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write(self.style.WARNING('Full-text search needs SQLite FTS5; nothing to rebuild.'))
+            return
+
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {FTS_TABLE} from {Scholarship.objects.count()} scholarships.'
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scholarship_app.stats import backfill_fields_of_study, rebuild_scholarship_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild ScholarshipStats and ScholarshipFieldCount from the stored recommendations. '
+        'The counters are maintained incrementally; run this after migrating or if they drift.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        backfilled = backfill_fields_of_study()
+        if backfilled:
+            self.stdout.write(f'Recorded the field of study on {backfilled} older recommendations')
+        scholarships, fields = rebuild_scholarship_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt stats for {scholarships} scholarships and {fields} field counts '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scholarship_app.models import RecomputeJob
+from scholarship_app.recompute import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the recompute jobs queued from the admin and by overloaded refreshes. Polls for new '
+        'jobs until interrupted, or exits once the queue is empty with --once. Keep one running '
+        'under a process supervisor; jobs whose worker died are requeued after RECOMPUTE_STALE_SECONDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no jobs are pending')
+        parser.add_argument('--poll', type=float, default=5, help='Seconds between checks of an empty queue')
+        parser.add_argument('--batch-size', type=int, default=settings.RECOMPUTE_BATCH_SIZE,
+                            help='Students per write transaction')
+        parser.add_argument('--pause', type=float, default=settings.RECOMPUTE_BATCH_PAUSE,
+                            help='Seconds to sleep between batches so other writers get the lock')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['pause'] < 0 or options['poll'] <= 0:
+            raise CommandError('--batch-size and --poll must be positive, --pause >= 0')
+
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['poll'])
+                continue
+            self.stdout.write(f'Running {job}...')
+            run_job(job, options['batch_size'], options['pause'])
+            job.refresh_from_db()
+            style = self.style.SUCCESS if job.status == RecomputeJob.DONE else self.style.ERROR
+            self.stdout.write(style(
+                f'{job}: {job.processed} of {job.total} students, {job.pairs_scored} pairs scored, '
+                f'{job.pairs_per_second or 0} pairs/s'
+            ))
@@ -0,0 +1,48 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scholarship_app.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database into the read replica (set VIDHYASATHI_REPLICA_DB) '
+        'using the online backup API, once or every --interval seconds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Repeat every N seconds; 0 copies once and exits')
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('No replica configured; set VIDHYASATHI_REPLICA_DB to the replica file path')
+
+        source_path = settings.DATABASES['default']['NAME']
+        target_path = settings.DATABASES[alias]['NAME']
+        timeout = settings.SQLITE_PRAGMAS.get('busy_timeout', 5000) / 1000
+
+        while True:
+            started = time.monotonic()
+            self.snapshot(source_path, target_path, timeout)
+            self.stdout.write(self.style.SUCCESS(
+                f'Replica refreshed in {(time.monotonic() - started) * 1000:.0f} ms'
+            ))
+            if not options['interval']:
+                break
+            time.sleep(max(0, options['interval'] - (time.monotonic() - started)))
+
+    def snapshot(self, source_path, target_path, timeout):
+        source = sqlite3.connect(source_path, timeout=timeout)
+        target = sqlite3.connect(target_path, timeout=timeout)
+        try:
+            # One step: readers of the replica see the old copy or the new
+            # one, never a mix
+            source.backup(target, pages=-1)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,88 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.utils.functional import cached_property
+
+from .models import Signup, StudentProfile
+
+
+class CurrentStudent:
+    """
+    The session's Signup and StudentProfile, resolved lazily and at most
+    once per request.
+
+    The profile is fetched together with its Signup in one joined query;
+    the Signup is only queried on its own when there is no profile yet.
+    """
+
+    def __init__(self, request):
+        self._request = request
+
+    @cached_property
+    def user_id(self):
+        return self._request.session.get('user_id')
+
+    @cached_property
+    def profile(self):
+        if not self.user_id:
+            return None
+        try:
+            return StudentProfile.objects.select_related('user').get(user_id=self.user_id)
+        except StudentProfile.DoesNotExist:
+            return None
+
+    @cached_property
+    def signup(self):
+        if self.profile is not None:
+            return self.profile.user
+        if not self.user_id:
+            return None
+        try:
+            return Signup.objects.get(id=self.user_id)
+        except Signup.DoesNotExist:
+            return None
+
+    async def aresolve(self):
+        """
+        Resolve the student from async code.
+
+        Loading the session and the profile here keeps later attribute
+        access (including from templates) free of synchronous queries.
+        """
+        if 'user_id' not in self.__dict__:
+            self.user_id = await sync_to_async(self._request.session.get)('user_id')
+        if 'profile' not in self.__dict__:
+            profile = None
+            if self.user_id:
+                try:
+                    profile = await StudentProfile.objects.select_related('user').aget(user_id=self.user_id)
+                except StudentProfile.DoesNotExist:
+                    pass
+            self.profile = profile
+        if 'signup' not in self.__dict__:
+            signup = self.profile.user if self.profile is not None else None
+            if signup is None and self.user_id:
+                signup = await Signup.objects.filter(id=self.user_id).afirst()
+            self.signup = signup
+        return self
+
+    def __bool__(self):
+        return self.signup is not None
+
+    def clear(self):
+        """Forget resolved objects, e.g. after the profile is created"""
+        for name in ('user_id', 'profile', 'signup'):
+            self.__dict__.pop(name, None)
+
+
+class CurrentStudentMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        # Returns the coroutine untouched when running under ASGI
+        request.student = CurrentStudent(request)
+        return self.get_response(request)
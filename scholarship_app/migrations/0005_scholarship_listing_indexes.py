@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0004_rename_min_gpa_scholarship_min_cgpa'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['deadline', 'id'], name='scholarship_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['amount', 'id'], name='scholarship_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['scholarship_type', 'deadline', 'id'], name='scholarship_type_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['education_level', 'deadline', 'id'], name='scholarship_level_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0005_scholarship_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScholarshipDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scholarship_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['updated_at', 'id'], name='scholarship_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:59
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.utils.timezone
+
+
+def backfill_topic_activity(apps, schema_editor):
+    ForumTopic = apps.get_model('scholarship_app', 'ForumTopic')
+    topics = ForumTopic.objects.annotate(
+        replies_total=Count('replies'),
+        last_reply_at=Max('replies__created_at'),
+    )
+    for topic in topics:
+        ForumTopic.objects.filter(pk=topic.pk).update(
+            reply_count=topic.replies_total,
+            last_activity_at=topic.last_reply_at or topic.created_at,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0007_scholarship_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumtopic',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='forumtopic',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='forumreply',
+            index=models.Index(fields=['topic', 'created_at', 'id'], name='forumreply_topic_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumtopic',
+            index=models.Index(fields=['last_activity_at', 'id'], name='forumtopic_activity_idx'),
+        ),
+        migrations.RunPython(backfill_topic_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0008_forum_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_fingerprint', models.CharField(max_length=40)),
+                ('catalog_version', models.CharField(max_length=64)),
+                ('recommendation_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_state', to='scholarship_app.studentprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:09
+
+import json
+
+from django.db import migrations
+import scholarship_app.fields
+
+from scholarship_app.fields import as_list
+from scholarship_app.search import install_search_index
+
+LIST_FIELDS = {
+    'Scholarship': (
+        'citizenship_requirements', 'field_of_study_requirements',
+        'minority_preferences', 'disability_preferences',
+    ),
+    'StudentProfile': ('extracurriculars', 'achievements', 'disabilities', 'minority_groups'),
+}
+
+
+def normalize_list_text(apps, schema_editor):
+    """Rewrite '', invalid and non-list text as JSON arrays so the column can be JSON-checked"""
+    for model_name, field_names in LIST_FIELDS.items():
+        model = apps.get_model('scholarship_app', model_name)
+        for row in model.objects.values('pk', *field_names):
+            updates = {}
+            for name in field_names:
+                normalized = json.dumps(as_list(row[name]))
+                if row[name] != normalized:
+                    updates[name] = normalized
+            if updates:
+                model.objects.filter(pk=row['pk']).update(**updates)
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Altering columns rebuilds the scholarship table on SQLite, which drops
+    # the full-text search triggers
+    install_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0009_recommendation_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_list_text, reinstall_search_index),
+        migrations.AlterField(
+            model_name='scholarship',
+            name='citizenship_requirements',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='scholarship',
+            name='disability_preferences',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='scholarship',
+            name='field_of_study_requirements',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='scholarship',
+            name='minority_preferences',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='achievements',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='disabilities',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='extracurriculars',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='minority_groups',
+            field=scholarship_app.fields.JSONListField(blank=True, default=list),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0010_eligibility_json_lists'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumtopic',
+            index=models.Index(fields=['updated_at', 'last_activity_at'], name='forumtopic_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['scholarship_type', 'amount', 'id'], name='scholarship_type_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['education_level', 'amount', 'id'], name='scholarship_level_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['scholarship_type', 'id'], name='scholarship_type_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['education_level', 'id'], name='scholarship_level_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarshiprecommendation',
+            index=models.Index(fields=['student', '-match_score'], name='recommendation_score_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:18
+
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, models
+import django.db.models.deletion
+
+COPY_BATCH_SIZE = 1000
+
+
+def copy_from_main_database(apps, schema_editor):
+    """
+    Copy rows written before the split from the main database, where the
+    old tables are left in place untouched (0018 drops them)
+    """
+    source, target = connections[DEFAULT_DB_ALIAS], schema_editor.connection
+    if target.alias == source.alias:
+        return
+    copy_tables(apps, source, target)
+
+
+def copy_tables(apps, source, target):
+    existing_tables = source.introspection.table_names()
+
+    for model_name in ('ScholarshipRecommendation', 'RecommendationState'):
+        model = apps.get_model('scholarship_app', model_name)
+        table = model._meta.db_table
+        if table not in existing_tables or model.objects.using(target.alias).exists():
+            continue
+
+        # Raw rows, so timestamps are kept rather than reset by auto_now(_add)
+        columns = ', '.join(source.ops.quote_name(field.column) for field in model._meta.concrete_fields)
+        placeholders = ', '.join(['%s'] * len(model._meta.concrete_fields))
+        with source.cursor() as reader, target.cursor() as writer:
+            reader.execute(f'SELECT {columns} FROM {source.ops.quote_name(table)}')
+            while True:
+                rows = reader.fetchmany(COPY_BATCH_SIZE)
+                if not rows:
+                    break
+                writer.executemany(
+                    f'INSERT INTO {target.ops.quote_name(table)} ({columns}) VALUES ({placeholders})', rows,
+                )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0011_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recommendationstate',
+            name='student',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='recommendation_state', to='scholarship_app.studentprofile'),
+        ),
+        migrations.AlterField(
+            model_name='scholarshiprecommendation',
+            name='scholarship',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='scholarship_app.scholarship'),
+        ),
+        migrations.AlterField(
+            model_name='scholarshiprecommendation',
+            name='student',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='scholarship_app.studentprofile'),
+        ),
+        migrations.RunPython(
+            copy_from_main_database, migrations.RunPython.noop,
+            hints={'model_name': 'scholarshiprecommendation'},
+        ),
+    ]
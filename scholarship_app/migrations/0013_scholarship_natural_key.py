@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:02
+
+from django.db import migrations, models
+
+from scholarship_app.search import install_search_index
+
+TITLE_MAX_LENGTH = 200
+
+
+def rename_duplicates(apps, schema_editor):
+    """Keep the oldest row of each (title, provider) and suffix the others' titles with their id"""
+    Scholarship = apps.get_model('scholarship_app', 'Scholarship')
+    seen = set()
+    for pk, title, provider in Scholarship.objects.order_by('id').values_list('id', 'title', 'provider'):
+        if (title, provider) in seen:
+            suffix = f' (#{pk})'
+            Scholarship.objects.filter(pk=pk).update(title=title[:TITLE_MAX_LENGTH - len(suffix)] + suffix)
+        else:
+            seen.add((title, provider))
+
+
+def reinstall_search_index(apps, schema_editor):
+    # Adding the constraint rebuilds the scholarship table on SQLite, which
+    # drops the full-text search triggers
+    install_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0012_recommendations_database'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, reinstall_search_index),
+        migrations.AddConstraint(
+            model_name='scholarship',
+            constraint=models.UniqueConstraint(fields=('title', 'provider'), name='scholarship_title_provider_uniq'),
+        ),
+        migrations.RunPython(reinstall_search_index, migrations.RunPython.noop),
+    ]
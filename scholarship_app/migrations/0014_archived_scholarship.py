@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:28
+
+from django.db import migrations, models
+import scholarship_app.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0013_scholarship_natural_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedScholarship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scholarship_id', models.BigIntegerField(unique=True)),
+                ('title', models.CharField(max_length=200)),
+                ('provider', models.CharField(max_length=200)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('deadline', models.DateField()),
+                ('description', models.TextField()),
+                ('eligibility', models.TextField()),
+                ('application_process', models.TextField()),
+                ('website', models.URLField()),
+                ('scholarship_type', models.CharField(choices=[('merit', 'Merit-Based'), ('need', 'Need-Based'), ('athletic', 'Athletic'), ('creative', 'Creative Arts'), ('minority', 'Minority'), ('international', 'International'), ('disability', 'Disability'), ('field_specific', 'Field Specific')], max_length=20)),
+                ('education_level', models.CharField(choices=[('high_school', 'High School'), ('undergraduate', 'Undergraduate'), ('graduate', 'Graduate'), ('phd', 'PhD'), ('any', 'Any')], max_length=20)),
+                ('min_cgpa', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('max_age', models.IntegerField(blank=True, null=True)),
+                ('min_age', models.IntegerField(blank=True, null=True)),
+                ('citizenship_requirements', scholarship_app.fields.JSONListField(blank=True, default=list)),
+                ('field_of_study_requirements', scholarship_app.fields.JSONListField(blank=True, default=list)),
+                ('minority_preferences', scholarship_app.fields.JSONListField(blank=True, default=list)),
+                ('disability_preferences', scholarship_app.fields.JSONListField(blank=True, default=list)),
+                ('income_max', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('income_min', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0014_archived_scholarship'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarshiprecommendation',
+            name='field_of_study',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='ScholarshipStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recommendation_count', models.IntegerField(default=0)),
+                ('score_total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('score_0_19', models.IntegerField(default=0)),
+                ('score_20_39', models.IntegerField(default=0)),
+                ('score_40_59', models.IntegerField(default=0)),
+                ('score_60_79', models.IntegerField(default=0)),
+                ('score_80_100', models.IntegerField(default=0)),
+                ('scholarship', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='stats', to='scholarship_app.scholarship')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScholarshipFieldCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_of_study', models.CharField(max_length=100)),
+                ('recommendation_count', models.IntegerField(default=0)),
+                ('scholarship', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='field_counts', to='scholarship_app.scholarship')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scholarship', '-recommendation_count'], name='fieldcount_top_idx')],
+                'unique_together': {('scholarship', 'field_of_study')},
+            },
+        ),
+    ]
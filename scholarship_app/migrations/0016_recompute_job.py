@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:34
+
+from django.db import migrations, models
+import scholarship_app.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0015_scholarship_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecomputeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('scholarships', 'Selected scholarships, for every student'), ('students', 'Selected students, for every scholarship')], max_length=20)),
+                ('target_ids', scholarship_app.fields.JSONListField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('pairs_scored', models.PositiveIntegerField(default=0)),
+                ('requested_by', models.CharField(blank=True, max_length=150)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='recomputejob_queue_idx')],
+            },
+        ),
+    ]
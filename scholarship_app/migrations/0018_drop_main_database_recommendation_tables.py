@@ -0,0 +1,79 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:41
+
+from importlib import import_module
+
+from django.db import DEFAULT_DB_ALIAS, connections, migrations, router
+
+# Tables left in the main database by 0012. They still have real foreign keys
+# to scholarships and profiles, so deleting either fails while they hold rows
+LEGACY_TABLES = ('scholarship_app_scholarshiprecommendation', 'scholarship_app_recommendationstate')
+
+copy_tables = import_module('scholarship_app.migrations.0012_recommendations_database').copy_tables
+
+
+def _legacy_tables(connection):
+    existing_tables = connection.introspection.table_names()
+    return [table for table in LEGACY_TABLES if table in existing_tables]
+
+
+def _drop_tables(connection, tables):
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'DROP TABLE {connection.ops.quote_name(table)}')
+
+
+def _strip_constraints(connection, tables):
+    # CREATE TABLE ... AS SELECT copies the rows but none of the constraints.
+    # The copy is only read by 0012 on the recommendations database
+    with connection.cursor() as cursor:
+        for table in tables:
+            quoted, staging = connection.ops.quote_name(table), connection.ops.quote_name(f'{table}__legacy')
+            cursor.execute(f'ALTER TABLE {quoted} RENAME TO {staging}')
+            cursor.execute(f'CREATE TABLE {quoted} AS SELECT * FROM {staging}')
+            cursor.execute(f'DROP TABLE {staging}')
+
+
+def detach_main_database_tables(apps, schema_editor):
+    """
+    Run on the main database. When the recommendations database is already
+    migrated, finish the copy and drop the legacy tables; otherwise keep the
+    rows for 0012 to copy later, but without their foreign keys
+    """
+    source = schema_editor.connection
+    tables = _legacy_tables(source)
+    if not tables:
+        return
+    target = connections[router.db_for_write(apps.get_model('scholarship_app', 'ScholarshipRecommendation'))]
+    if target.alias == source.alias:
+        return
+    if set(tables) <= set(target.introspection.table_names()):
+        copy_tables(apps, source, target)
+        _drop_tables(source, tables)
+    else:
+        _strip_constraints(source, tables)
+
+
+def drop_main_database_tables(apps, schema_editor):
+    """Run on the recommendations database, after 0012 has copied the legacy rows"""
+    source, target = connections[DEFAULT_DB_ALIAS], schema_editor.connection
+    if target.alias == source.alias:
+        return
+    tables = _legacy_tables(source)
+    if tables:
+        copy_tables(apps, source, target)
+        _drop_tables(source, tables)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0017_recommendation_refresh_lease'),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_main_database_tables, migrations.RunPython.noop),
+        migrations.RunPython(
+            drop_main_database_tables, migrations.RunPython.noop,
+            hints={'model_name': 'scholarshiprecommendation'},
+        ),
+    ]
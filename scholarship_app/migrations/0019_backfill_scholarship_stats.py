@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:58
+
+from django.db import migrations
+
+from scholarship_app.stats import backfill_fields_of_study, rebuild_scholarship_stats
+
+
+def backfill_scholarship_stats(apps, schema_editor):
+    # 0015 created the counters empty; recommendations scored before it have
+    # no field of study and were never counted
+    backfill_fields_of_study()
+    rebuild_scholarship_stats()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0018_drop_main_database_recommendation_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_scholarship_stats, migrations.RunPython.noop,
+            hints={'model_name': 'scholarshipstats'},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scholarship_app', '0019_backfill_scholarship_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recomputejob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
+import hashlib
 import json
+from decimal import Decimal
+
+from .fields import JSONListField, as_list
 
 
 class Signup(models.Model):
@@ -39,37 +43,53 @@ class StudentProfile(models.Model):
     financial_aid_needed = models.BooleanField(default=False)
     
     # Additional Criteria
-    extracurriculars = models.TextField(blank=True)  # JSON stored as text
-    achievements = models.TextField(blank=True)      # JSON stored as text
-    disabilities = models.TextField(blank=True)      # JSON stored as text
-    minority_groups = models.TextField(blank=True)   # JSON stored as text
+    extracurriculars = JSONListField()
+    achievements = JSONListField()
+    disabilities = JSONListField()
+    minority_groups = JSONListField()
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def get_extracurriculars(self):
-        try:
-            return json.loads(self.extracurriculars) if self.extracurriculars else []
-        except:
-            return []
+        return as_list(self.extracurriculars)
     
     def get_achievements(self):
-        try:
-            return json.loads(self.achievements) if self.achievements else []
-        except:
-            return []
+        return as_list(self.achievements)
     
     def get_disabilities(self):
-        try:
-            return json.loads(self.disabilities) if self.disabilities else []
-        except:
-            return []
+        return as_list(self.disabilities)
     
     def get_minority_groups(self):
-        try:
-            return json.loads(self.minority_groups) if self.minority_groups else []
-        except:
-            return []
+        return as_list(self.minority_groups)
+    
+    def scoring_fingerprint(self, open_until=None):
+        """
+        Stable hash of the fields recommendation scoring reads, and of
+        open_until (catalog.next_expiry()), so scores go stale when a
+        recommended scholarship closes
+        """
+        scoring_inputs = {
+            'open_until': open_until,
+            'date_of_birth': self.date_of_birth,
+            'education_level': self.education_level,
+            'field_of_study': self.field_of_study,
+            'cgpa': self.cgpa,
+            'family_income': self.family_income,
+            'financial_aid_needed': self.financial_aid_needed,
+            # Order within the lists doesn't affect matching
+            'extracurriculars': sorted(map(str, self.get_extracurriculars())),
+            'achievements': sorted(map(str, self.get_achievements())),
+            'disabilities': sorted(map(str, self.get_disabilities())),
+            'minority_groups': sorted(map(str, self.get_minority_groups())),
+        }
+        # Form input and database values differ in scale (3.5 vs 3.50), and
+        # values assigned in code may still be ints or floats
+        for name in ('cgpa', 'family_income'):
+            if scoring_inputs[name] is not None:
+                scoring_inputs[name] = Decimal(str(scoring_inputs[name])).normalize()
+        encoded = json.dumps(scoring_inputs, sort_keys=True, default=str)
+        return hashlib.sha1(encoded.encode()).hexdigest()
     
     def __str__(self):
         return f"{self.user.name}'s Profile" 
@@ -109,39 +129,47 @@ class Scholarship(models.Model):
     min_cgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)  # Changed max_digits to 4
     max_age = models.IntegerField(null=True, blank=True)
     min_age = models.IntegerField(null=True, blank=True)
-    citizenship_requirements = models.TextField(blank=True)  # JSON stored as text
-    field_of_study_requirements = models.TextField(blank=True)  # JSON stored as text
-    minority_preferences = models.TextField(blank=True)  # JSON stored as text
-    disability_preferences = models.TextField(blank=True)  # JSON stored as text
+    citizenship_requirements = JSONListField()
+    field_of_study_requirements = JSONListField()
+    minority_preferences = JSONListField()
+    disability_preferences = JSONListField()
     income_max = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     income_min = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination on the scholarships listing
+            models.Index(fields=['deadline', 'id'], name='scholarship_deadline_idx'),
+            models.Index(fields=['amount', 'id'], name='scholarship_amount_idx'),
+            models.Index(fields=['scholarship_type', 'deadline', 'id'], name='scholarship_type_deadline_idx'),
+            models.Index(fields=['education_level', 'deadline', 'id'], name='scholarship_level_deadline_idx'),
+            models.Index(fields=['scholarship_type', 'amount', 'id'], name='scholarship_type_amount_idx'),
+            models.Index(fields=['education_level', 'amount', 'id'], name='scholarship_level_amount_idx'),
+            # Partner API pages by id within a type or level
+            models.Index(fields=['scholarship_type', 'id'], name='scholarship_type_id_idx'),
+            models.Index(fields=['education_level', 'id'], name='scholarship_level_id_idx'),
+            # Delta sync walks changes in (updated_at, id) order
+            models.Index(fields=['updated_at', 'id'], name='scholarship_updated_idx'),
+        ]
+        constraints = [
+            # Natural key for feed imports, which upsert on it
+            models.UniqueConstraint(fields=['title', 'provider'], name='scholarship_title_provider_uniq'),
+        ]
+    
     def get_citizenship_requirements(self):
-        try:
-            return json.loads(self.citizenship_requirements) if self.citizenship_requirements else []
-        except:
-            return []
+        return as_list(self.citizenship_requirements)
     
     def get_field_of_study_requirements(self):
-        try:
-            return json.loads(self.field_of_study_requirements) if self.field_of_study_requirements else []
-        except:
-            return []
+        return as_list(self.field_of_study_requirements)
     
     def get_minority_preferences(self):
-        try:
-            return json.loads(self.minority_preferences) if self.minority_preferences else []
-        except:
-            return []
+        return as_list(self.minority_preferences)
     
     def get_disability_preferences(self):
-        try:
-            return json.loads(self.disability_preferences) if self.disability_preferences else []
-        except:
-            return []
+        return as_list(self.disability_preferences)
     
     def __str__(self):
         return self.title
@@ -149,18 +177,192 @@ class Scholarship(models.Model):
     def is_deadline_approaching(self):
         return self.deadline <= timezone.now().date() + timezone.timedelta(days=30)
 
+class ScholarshipDeletion(models.Model):
+    """Tombstone log so sync clients can drop deleted scholarships"""
+    scholarship_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"Scholarship #{self.scholarship_id} deleted at {self.deleted_at}"
+
+class ArchivedScholarship(models.Model):
+    """Expired scholarship moved out of the live table by `manage.py apply_retention`"""
+    scholarship_id = models.BigIntegerField(unique=True)
+    title = models.CharField(max_length=200)
+    provider = models.CharField(max_length=200)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    deadline = models.DateField()
+    description = models.TextField()
+    eligibility = models.TextField()
+    application_process = models.TextField()
+    website = models.URLField()
+    scholarship_type = models.CharField(max_length=20, choices=Scholarship.SCHOLARSHIP_TYPES)
+    education_level = models.CharField(max_length=20, choices=Scholarship.EDUCATION_LEVELS)
+    min_cgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
+    max_age = models.IntegerField(null=True, blank=True)
+    min_age = models.IntegerField(null=True, blank=True)
+    citizenship_requirements = JSONListField()
+    field_of_study_requirements = JSONListField()
+    minority_preferences = JSONListField()
+    disability_preferences = JSONListField()
+    income_max = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    income_min = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    # Copied from the live row
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    def __str__(self):
+        return f"{self.title} (archived {self.archived_at:%Y-%m-%d})"
+
+# Stored in the recommendations database (see routers.py): the foreign keys
+# can't be enforced across files, and deletes are propagated by signals
 class ScholarshipRecommendation(models.Model):
-    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE)
-    scholarship = models.ForeignKey(Scholarship, on_delete=models.CASCADE)
+    student = models.ForeignKey(StudentProfile, on_delete=models.DO_NOTHING, db_constraint=False)
+    scholarship = models.ForeignKey(Scholarship, on_delete=models.DO_NOTHING, db_constraint=False)
     match_score = models.DecimalField(max_digits=5, decimal_places=2)
     reason = models.TextField()
+    # The student's field when scored; ScholarshipStats counts by it
+    field_of_study = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         unique_together = ('student', 'scholarship')
+        indexes = [
+            # A student's recommendations best match first, without a sort step
+            models.Index(fields=['student', '-match_score'], name='recommendation_score_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.student.user.username} - {self.scholarship.title} ({self.match_score}%)"
+        return f"{self.student.user.name} - {self.scholarship.title} ({self.match_score}%)"
+
+class RecommendationState(models.Model):
+    """What a student's stored recommendations were last computed from"""
+    student = models.OneToOneField(StudentProfile, on_delete=models.DO_NOTHING, db_constraint=False,
+                                   related_name='recommendation_state')
+    profile_fingerprint = models.CharField(max_length=40)
+    catalog_version = models.CharField(max_length=64)
+    recommendation_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+    # Set while a process rescores the student, so refreshes in other
+    # processes wait for it rather than rescoring too; see utils.claim_refresh
+    refresh_lease_until = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Recommendations for profile #{self.student_id} refreshed at {self.refreshed_at}"
+
+class ScholarshipStats(models.Model):
+    """
+    Per-scholarship recommendation totals, kept up to date by the
+    recommendation write path (see scholarship_app.stats) so the admin
+    can show them without aggregating recommendations
+    """
+    # Lower bound of each match score bucket and its column
+    SCORE_BUCKETS = [
+        (0, 'score_0_19'),
+        (20, 'score_20_39'),
+        (40, 'score_40_59'),
+        (60, 'score_60_79'),
+        (80, 'score_80_100'),
+    ]
+    
+    scholarship = models.OneToOneField(Scholarship, on_delete=models.DO_NOTHING, db_constraint=False,
+                                       related_name='stats')
+    recommendation_count = models.IntegerField(default=0)
+    score_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    score_0_19 = models.IntegerField(default=0)
+    score_20_39 = models.IntegerField(default=0)
+    score_40_59 = models.IntegerField(default=0)
+    score_60_79 = models.IntegerField(default=0)
+    score_80_100 = models.IntegerField(default=0)
+    
+    @property
+    def average_score(self):
+        if self.recommendation_count <= 0:
+            return None
+        return (self.score_total / self.recommendation_count).quantize(Decimal('0.1'))
+    
+    @property
+    def histogram(self):
+        return [getattr(self, column) for _, column in self.SCORE_BUCKETS]
+    
+    def __str__(self):
+        return f"Stats for scholarship #{self.scholarship_id}"
+
+class ScholarshipFieldCount(models.Model):
+    """Recommendations of a scholarship per student field of study"""
+    scholarship = models.ForeignKey(Scholarship, on_delete=models.DO_NOTHING, db_constraint=False,
+                                    related_name='field_counts')
+    field_of_study = models.CharField(max_length=100)
+    recommendation_count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('scholarship', 'field_of_study')
+        indexes = [
+            models.Index(fields=['scholarship', '-recommendation_count'], name='fieldcount_top_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.field_of_study}: {self.recommendation_count}"
+
+class RecomputeJob(models.Model):
+    """
+    Background recomputation of recommendations queued from the admin;
+    run by scholarship_app.recompute
+    """
+    SCHOLARSHIPS = 'scholarships'
+    STUDENTS = 'students'
+    KIND_CHOICES = [
+        (SCHOLARSHIPS, 'Selected scholarships, for every student'),
+        (STUDENTS, 'Selected students, for every scholarship'),
+    ]
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    target_ids = JSONListField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    # Students to process, and how many are done
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    pairs_scored = models.PositiveIntegerField(default=0)
+    requested_by = models.CharField(max_length=150, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Bumped by the worker after every batch; see recompute.requeue_stale_jobs
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='recomputejob_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Recompute #{self.pk} ({self.get_kind_display()}): {self.status}"
+    
+    @property
+    def percent_done(self):
+        if self.status == self.DONE or not self.total:
+            return 100 if self.status == self.DONE else 0
+        return min(100, round(100 * self.processed / self.total))
+    
+    @property
+    def pairs_per_second(self):
+        """Scoring throughput so far, or over the whole run once finished"""
+        if not self.started_at:
+            return None
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.pairs_scored / elapsed) if elapsed > 0 else None
 
 class ForumTopic(models.Model):
     user = models.ForeignKey(Signup, on_delete=models.CASCADE)
@@ -169,6 +371,17 @@ class ForumTopic(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Denormalized from ForumReply so the topic list needs no per-topic queries
+    reply_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_activity_at', 'id'], name='forumtopic_activity_idx'),
+            # Covers forum_version() so it reads the index rather than the table
+            models.Index(fields=['updated_at', 'last_activity_at'], name='forumtopic_version_idx'),
+        ]
+    
     def __str__(self):
         return self.title
 
@@ -178,5 +391,21 @@ class ForumReply(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['topic', 'created_at', 'id'], name='forumreply_topic_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        # The reply and the topic counters commit together or not at all
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                ForumTopic.objects.filter(pk=self.topic_id).update(
+                    reply_count=models.F('reply_count') + 1,
+                    last_activity_at=self.created_at,
+                )
+    
     def __str__(self):
-        return f"Reply to {self.topic.title} by {self.user.username}"
\ No newline at end of file
+        return f"Reply to {self.topic.title} by {self.user.name}"
\ No newline at end of file
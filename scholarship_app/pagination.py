@@ -0,0 +1,190 @@
+import base64
+import hashlib
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    """A single page of a keyset (cursor) paginated queryset"""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values):
+    payload = json.dumps([_encode_value(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode a cursor back into python values for the ordering fields"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(str(exc))
+
+    if not isinstance(raw, list) or len(raw) != len(ordering):
+        raise InvalidCursor("Cursor does not match the ordering")
+
+    values = []
+    for name, value in zip(ordering, raw):
+        try:
+            field = model._meta.get_field(name.lstrip('-'))
+        except FieldDoesNotExist:
+            # An annotation such as a search rank: JSON gives its number back as is
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise InvalidCursor(f"Invalid value for {name}")
+            values.append(value)
+            continue
+        try:
+            values.append(field.to_python(value))
+        except Exception as exc:
+            raise InvalidCursor(str(exc))
+    return values
+
+
+def _row_value(row, name):
+    if isinstance(row, dict):
+        return row[name]
+    try:
+        field = row._meta.get_field(name)
+    except FieldDoesNotExist:
+        return getattr(row, name)
+    return getattr(row, field.attname)
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the "rows after this position" condition for a multi-column
+    ordering, e.g. for ('-deadline', '-id'):
+        deadline < x OR (deadline = x AND id < y)
+    """
+    condition = Q()
+    for i, name in enumerate(ordering):
+        field = name.lstrip('-')
+        lookup = 'lt' if name.startswith('-') else 'gt'
+        term = Q(**{f'{field}__{lookup}': values[i]})
+        for prev_name, prev_value in zip(ordering[:i], values[:i]):
+            term &= Q(**{prev_name.lstrip('-'): prev_value})
+        condition |= term
+    return condition
+
+
+def _page_queryset(queryset, ordering, cursor, page_size):
+    queryset = queryset.order_by(*ordering)
+
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, ordering)
+        queryset = queryset.filter(keyset_filter(ordering, values))
+
+    return queryset[:page_size + 1]
+
+
+def _make_page(rows, ordering, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([_row_value(last, name.lstrip('-')) for name in ordering])
+
+    return KeysetPage(rows, next_cursor)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, page_size=20):
+    """
+    Paginate ``queryset`` by ``ordering`` without OFFSET.
+
+    The last ordering field must be unique (normally ``id``) so every row
+    has a distinct position. Raises InvalidCursor for a malformed cursor.
+    """
+    ordering = tuple(ordering)
+    rows = list(_page_queryset(queryset, ordering, cursor, page_size))
+    return _make_page(rows, ordering, page_size)
+
+
+async def akeyset_paginate(queryset, ordering, cursor=None, page_size=20):
+    """Async version of keyset_paginate using the async ORM interface"""
+    ordering = tuple(ordering)
+    rows = [row async for row in _page_queryset(queryset, ordering, cursor, page_size)]
+    return _make_page(rows, ordering, page_size)
+
+
+def estimated_row_count(model, using):
+    """
+    Rows in model's table according to sqlite_stat1 (written by ANALYZE),
+    or None when there are no statistics for it
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [model._meta.db_table])
+        counts = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+    return max(counts) if counts else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists over large tables.
+
+    Counts up to settings.ADMIN_EXACT_COUNT_LIMIT rows exactly, with a
+    COUNT(*) over a LIMITed subquery so it never reads more rows than
+    that. Beyond the limit the count is cached for
+    ADMIN_COUNT_CACHE_SECONDS, and taken from the table statistics instead
+    of a full COUNT(*) when the changelist is unfiltered and statistics
+    exist. Page numbers past the real end just come out empty.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        bounded = queryset.order_by()[:limit + 1].count()
+        if bounded <= limit:
+            return bounded
+
+        key = 'admin-count:' + hashlib.md5(f'{queryset.db}:{queryset.query}'.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            if not queryset.query.has_filters():
+                count = estimated_row_count(queryset.model, queryset.db)
+            if count is None or count < bounded:
+                count = queryset.count()
+            cache.set(key, count, settings.ADMIN_COUNT_CACHE_SECONDS)
+        return count
@@ -0,0 +1,110 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+_bucket_lock = threading.Lock()
+_scoring_slots = None
+_scoring_slots_lock = threading.Lock()
+
+
+class ScoringOverloaded(Exception):
+    """Too many recommendation rescoring requests are already running"""
+
+    retry_after = 5
+
+
+def client_key(request):
+    """Logged-in students are limited per account, everyone else per IP"""
+    user_id = request.session.get('user_id')
+    if user_id:
+        return f'user:{user_id}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def take_token(key, rate, period, burst):
+    """
+    Token bucket kept in the local cache: ``burst`` tokens, refilled at
+    ``rate`` per ``period`` seconds. Returns seconds to wait, 0 if allowed.
+    """
+    cache = caches[settings.RATE_LIMIT_CACHE]
+    refill_per_second = rate / period
+    now = time.monotonic()
+
+    with _bucket_lock:
+        tokens, updated = cache.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * refill_per_second)
+        if tokens >= 1:
+            cache.set(key, (tokens - 1, now), timeout=period * 2)
+            return 0
+        cache.set(key, (tokens, now), timeout=period * 2)
+        return (1 - tokens) / refill_per_second
+
+
+def _get_scoring_slots():
+    global _scoring_slots
+    with _scoring_slots_lock:
+        if _scoring_slots is None:
+            _scoring_slots = threading.BoundedSemaphore(settings.SCORING_MAX_IN_FLIGHT)
+        return _scoring_slots
+
+
+@contextmanager
+def scoring_slot(wait=False):
+    """
+    Reserve one of this process's rescoring slots or fail fast with
+    ScoringOverloaded, so a burst of refreshes can't tie up every worker;
+    background jobs pass wait=True to queue for a slot instead.
+    The slots are a semaphore per process, not shared between workers:
+    with N worker processes up to N * SCORING_MAX_IN_FLIGHT can score.
+    """
+    slots = _get_scoring_slots()
+    if not slots.acquire(blocking=wait):
+        raise ScoringOverloaded()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def too_many_requests(retry_after, status=429, message='Too many requests, please slow down.'):
+    response = HttpResponse(message, status=status, content_type='text/plain')
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Applies settings.RATE_LIMITS, keyed by URL name, e.g.
+        {'login': {'rate': 10, 'period': 60, 'burst': 5, 'methods': ['POST']}}
+    and turns ScoringOverloaded into a 503.
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        limit = settings.RATE_LIMITS.get(url_name)
+        if not limit:
+            return None
+
+        methods = limit.get('methods')
+        if methods and request.method not in methods:
+            return None
+
+        rate, period = limit['rate'], limit.get('period', 60)
+        wait = take_token(f'ratelimit:{url_name}:{client_key(request)}', rate, period, limit.get('burst', rate))
+        if wait:
+            return too_many_requests(wait)
+        return None
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, ScoringOverloaded):
+            return too_many_requests(
+                exception.retry_after, status=503,
+                message='We are busy updating recommendations, please try again shortly.',
+            )
+        return None
@@ -0,0 +1,264 @@
+"""
+Compiled scoring catalog.
+
+`manage.py compile_catalog` writes the columns calculate_match_score()
+reads into one binary file. Each worker process mmaps that file, so every
+worker on a host shares one copy through the page cache, and scoring
+reads it in place instead of building Scholarship instances from SQLite.
+
+Layout, little-endian, each section aligned to 8 bytes:
+
+    header      magic, format version, record count, string count, then
+                (offset, length) for each section in SECTIONS order
+    version     the catalog version the file was compiled from (utf-8)
+    strings     string table: uint32 offsets (count + 1) and a utf-8 blob;
+                choice values and list items are stored once and referenced
+                by index everywhere else
+    ids, ...    one fixed-width array per scoring column, NULL as a
+                sentinel; money and CGPA as int64 hundredths, deadlines as
+                int32 day ordinals
+    *_offsets   for list columns, uint32 start positions (count + 1) into
+    *_items     a flat uint32 array of string indexes
+
+Publishing writes a temporary file and renames it over the old one, so a
+reader maps either the old file or the new one, never a partial write.
+"""
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from datetime import date
+from decimal import Decimal
+
+MAGIC = b'VSCATLG\x00'
+FORMAT_VERSION = 2
+NULL_NUMBER = -(2 ** 63)
+NULL_STRING = 0xFFFFFFFF
+
+NUMBER_COLUMNS = ('min_cgpa', 'income_min', 'income_max')
+DATE_COLUMNS = ('deadline',)
+CHOICE_COLUMNS = ('education_level', 'scholarship_type')
+LIST_COLUMNS = ('field_of_study_requirements', 'minority_preferences', 'disability_preferences')
+
+SECTIONS = (
+    'version', 'string_offsets', 'strings', 'ids',
+    *CHOICE_COLUMNS, *NUMBER_COLUMNS, *DATE_COLUMNS,
+    *(f'{column}_{part}' for column in LIST_COLUMNS for part in ('offsets', 'items')),
+)
+HEADER = struct.Struct('<8sHxxII' + 'QQ' * len(SECTIONS))
+ALIGNMENT = 8
+
+
+class CatalogFileError(ValueError):
+    pass
+
+
+def _hundredths(value):
+    return NULL_NUMBER if value is None else int(Decimal(value).scaleb(2))
+
+
+def compile_catalog(scholarships, version, path):
+    """
+    Write scholarships (an iterable of Scholarship) to path, replacing any
+    previous file atomically. Returns the number of records written.
+    """
+    strings, string_ids = [], {}
+
+    def intern(value):
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    columns = {name: [] for name in ('ids', *CHOICE_COLUMNS, *NUMBER_COLUMNS, *DATE_COLUMNS)}
+    lists = {column: ([0], []) for column in LIST_COLUMNS}
+    for scholarship in scholarships:
+        columns['ids'].append(scholarship.id)
+        for name in CHOICE_COLUMNS:
+            value = getattr(scholarship, name)
+            columns[name].append(intern(value) if value else NULL_STRING)
+        for name in NUMBER_COLUMNS:
+            columns[name].append(_hundredths(getattr(scholarship, name)))
+        for name in DATE_COLUMNS:
+            columns[name].append(getattr(scholarship, name).toordinal())
+        for name in LIST_COLUMNS:
+            offsets, items = lists[name]
+            items.extend(intern(str(item)) for item in getattr(scholarship, name) if item)
+            offsets.append(len(items))
+
+    encoded = [value.encode() for value in strings]
+    string_offsets = [0]
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+
+    sections = {
+        'version': version.encode(),
+        'string_offsets': struct.pack(f'<{len(string_offsets)}I', *string_offsets),
+        'strings': b''.join(encoded),
+        'ids': struct.pack(f"<{len(columns['ids'])}q", *columns['ids']),
+    }
+    for name in CHOICE_COLUMNS:
+        sections[name] = struct.pack(f'<{len(columns[name])}I', *columns[name])
+    for name in NUMBER_COLUMNS:
+        sections[name] = struct.pack(f'<{len(columns[name])}q', *columns[name])
+    for name in DATE_COLUMNS:
+        sections[name] = struct.pack(f'<{len(columns[name])}i', *columns[name])
+    for name, (offsets, items) in lists.items():
+        sections[f'{name}_offsets'] = struct.pack(f'<{len(offsets)}I', *offsets)
+        sections[f'{name}_items'] = struct.pack(f'<{len(items)}I', *items)
+
+    table, body, position = [], bytearray(), HEADER.size
+    for name in SECTIONS:
+        padding = -position % ALIGNMENT
+        body += b'\x00' * padding
+        position += padding
+        table += [position, len(sections[name])]
+        body += sections[name]
+        position += len(sections[name])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(columns['ids']), len(strings), *table)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix='.catalog-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return len(columns['ids'])
+
+
+class CompiledCatalog:
+    """A mapped catalog file; entries read their columns straight from the mapping"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.stat = os.fstat(f.fileno())
+            if self.stat.st_size < HEADER.size:
+                raise CatalogFileError(f'{path} is too short to be a catalog')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, self.count, string_count, *table = HEADER.unpack_from(self._map)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise CatalogFileError(f'{path} is not a version {FORMAT_VERSION} catalog')
+
+        view = memoryview(self._map)
+        sections = {}
+        for name, offset, length in zip(SECTIONS, table[::2], table[1::2]):
+            if offset + length > self.stat.st_size:
+                raise CatalogFileError(f'{path} is truncated')
+            sections[name] = view[offset:offset + length]
+
+        self.version = bytes(sections['version']).decode()
+        offsets = sections['string_offsets'].cast('I')
+        blob = sections['strings']
+        # The vocabulary (choice values, list items) is small; decode it once
+        self.strings = tuple(bytes(blob[offsets[i]:offsets[i + 1]]).decode() for i in range(string_count))
+
+        self.ids = sections['ids'].cast('q')
+        self.columns = {name: sections[name].cast('I') for name in CHOICE_COLUMNS}
+        self.columns.update({name: sections[name].cast('q') for name in NUMBER_COLUMNS})
+        self.columns.update({name: sections[name].cast('i') for name in DATE_COLUMNS})
+        self.lists = {
+            name: (sections[f'{name}_offsets'].cast('I'), sections[f'{name}_items'].cast('I'))
+            for name in LIST_COLUMNS
+        }
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (CatalogEntry(self, index) for index in range(self.count))
+
+    def active(self, today):
+        """Entries whose deadline is today or later"""
+        deadlines, cutoff = self.columns['deadline'], today.toordinal()
+        return (CatalogEntry(self, index) for index in range(self.count) if deadlines[index] >= cutoff)
+
+    def is_current_file(self, path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino, stat.st_dev, stat.st_mtime_ns) == (
+            self.stat.st_ino, self.stat.st_dev, self.stat.st_mtime_ns
+        )
+
+
+class CatalogEntry:
+    """
+    One scholarship's scoring columns, with the attribute names and
+    accessors calculate_match_score() uses on a Scholarship
+    """
+    __slots__ = ('_catalog', '_index')
+
+    def __init__(self, catalog, index):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def id(self):
+        return self._catalog.ids[self._index]
+
+    def _choice(self, name):
+        value = self._catalog.columns[name][self._index]
+        return '' if value == NULL_STRING else self._catalog.strings[value]
+
+    def _number(self, name):
+        value = self._catalog.columns[name][self._index]
+        return None if value == NULL_NUMBER else Decimal(value).scaleb(-2)
+
+    @property
+    def deadline(self):
+        return date.fromordinal(self._catalog.columns['deadline'][self._index])
+
+    def _list(self, name):
+        offsets, items = self._catalog.lists[name]
+        strings = self._catalog.strings
+        return [strings[item] for item in items[offsets[self._index]:offsets[self._index + 1]]]
+
+    education_level = property(lambda self: self._choice('education_level'))
+    scholarship_type = property(lambda self: self._choice('scholarship_type'))
+    min_cgpa = property(lambda self: self._number('min_cgpa'))
+    income_min = property(lambda self: self._number('income_min'))
+    income_max = property(lambda self: self._number('income_max'))
+    field_of_study_requirements = property(lambda self: self._list('field_of_study_requirements'))
+    minority_preferences = property(lambda self: self._list('minority_preferences'))
+    disability_preferences = property(lambda self: self._list('disability_preferences'))
+
+    def get_field_of_study_requirements(self):
+        return self.field_of_study_requirements
+
+    def get_minority_preferences(self):
+        return self.minority_preferences
+
+    def get_disability_preferences(self):
+        return self.disability_preferences
+
+
+_current = None
+_lock = threading.Lock()
+
+
+def load_catalog(path):
+    """
+    The mapped catalog at path, remapped when a new file has been published
+    there since the last call. None when there is no usable file.
+    """
+    global _current
+    catalog = _current
+    if catalog is not None and catalog.is_current_file(path):
+        return catalog
+    with _lock:
+        if _current is None or not _current.is_current_file(path):
+            try:
+                _current = CompiledCatalog(path)
+            except (FileNotFoundError, CatalogFileError):
+                _current = None
+        # Entries still iterating the old mapping keep it alive until they finish
+        return _current
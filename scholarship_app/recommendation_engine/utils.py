@@ -1,54 +1,212 @@
 # recommendation_engine/utils.py
-from ..models import Scholarship, StudentProfile, ScholarshipRecommendation, Signup
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..catalog import catalog_version, format_catalog_version, next_expiry
+from ..models import Scholarship, StudentProfile, ScholarshipRecommendation, RecommendationState, Signup
+from ..ratelimit import scoring_slot
+from ..stats import add_recommendations, replace_student_recommendations
+from .compiled_catalog import load_catalog
+from .singleflight import SingleFlight
+from datetime import timedelta
 from decimal import Decimal
-import json
+import time
 
-def get_recommendations_for_user(user, limit=None):
+_refreshes = SingleFlight()
+
+def get_recommendations_for_profile(profile, limit=None):
     """
-    Get scholarship recommendations for a Signup user
+    Get scholarship recommendations for an already loaded student profile
     """
-    try:
-        # Get the student profile for this user
-        profile = StudentProfile.objects.get(user=user)
-        
-        # Get all recommendations for this student, ordered by match score
-        recommendations = ScholarshipRecommendation.objects.filter(
-            student=profile
-        ).select_related('scholarship').order_by('-match_score')
-        
-        if limit:
-            recommendations = recommendations[:limit]
-            
-        return recommendations
-    except StudentProfile.DoesNotExist:
-        return []
+    # Get all recommendations for this student, ordered by match score
+    recommendations = ScholarshipRecommendation.objects.filter(
+        student=profile
+    ).order_by('-match_score')
+    
+    if limit:
+        recommendations = recommendations[:limit]
+    
+    recommendations = list(recommendations)
+    scholarships = Scholarship.objects.in_bulk({r.scholarship_id for r in recommendations})
+    return attach_scholarships(recommendations, scholarships)
+
+async def aget_recommendations_for_profile(profile, limit=None):
+    """
+    Async read path for recommendations; returns a list since querysets
+    can't be evaluated lazily from templates in async views
+    """
+    recommendations = ScholarshipRecommendation.objects.filter(student=profile).order_by('-match_score')
+    if limit:
+        recommendations = recommendations[:limit]
+    
+    recommendations = [recommendation async for recommendation in recommendations]
+    scholarships = await Scholarship.objects.ain_bulk({r.scholarship_id for r in recommendations})
+    return attach_scholarships(recommendations, scholarships)
+
+def attach_scholarships(recommendations, scholarships):
+    """
+    Set each recommendation's scholarship from an id -> Scholarship map;
+    recommendations live in another database, so this replaces a join.
+    Rows whose scholarship no longer exists are dropped.
+    """
+    attached = []
+    for recommendation in recommendations:
+        scholarship = scholarships.get(recommendation.scholarship_id)
+        if scholarship is not None:
+            recommendation.scholarship = scholarship
+            attached.append(recommendation)
+    return attached
 
 def refresh_recommendations_for_student(profile):
     """
     Refresh scholarship recommendations for a student profile
+    
+    Rescoring is skipped when neither the scoring-relevant profile fields
+    nor the catalog changed since the stored recommendations were computed.
+    Concurrent refreshes for the same student (double submits, several
+    tabs) share one run: within a process through SingleFlight, and
+    across worker processes through a lease on the student's
+    RecommendationState row (see claim_refresh).
     """
-    # Clear existing recommendations
-    ScholarshipRecommendation.objects.filter(student=profile).delete()
+    stamp = current_stamp(profile)
     
-    # Get all scholarships
-    all_scholarships = Scholarship.objects.all()
+    def run():
+        if not claim_refresh(profile.pk):
+            # Another process is rescoring this student; wait for its result
+            state = wait_for_refresh(profile.pk)
+            if state is not None:
+                return (state.profile_fingerprint, state.catalog_version), state.recommendation_count
+            if not claim_refresh(profile.pk):
+                return None, 0
+        try:
+            with scoring_slot():
+                count = rescore_and_record(profile, stamp)
+        finally:
+            release_refresh(profile.pk)
+        return stamp, count
     
-    count = 0
-    for scholarship in all_scholarships:
-        match_score = calculate_match_score(profile, scholarship)
+    while True:
+        state = RecommendationState.objects.filter(student=profile).first()
+        if state and (state.profile_fingerprint, state.catalog_version) == stamp:
+            return state.recommendation_count
         
-        # Create recommendation even with lower scores, but prioritize higher ones
-        if match_score > 20:  # Lower threshold to get more recommendations
-            ScholarshipRecommendation.objects.create(
-                student=profile,
-                scholarship=scholarship,
-                match_score=match_score,
-                reason=generate_recommendation_reason(profile, scholarship, match_score)
-            )
-            count += 1
-    
+        (result_stamp, count), shared = _refreshes.do(profile.pk, run)
+        # A shared run, or one from another process, may have scored an
+        # older version of the profile
+        if result_stamp == stamp:
+            return count
+
+# How long a refresh may hold a student before others stop waiting for it
+REFRESH_LEASE_SECONDS = 30
+REFRESH_POLL_SECONDS = 0.05
+
+def claim_refresh(student_id):
+    """
+    Take the refresh lease on a student; False when another process holds
+    it. Each attempt is a single write statement, so it never has to read
+    inside a write transaction.
+    """
+    now = timezone.now()
+    until = now + timedelta(seconds=REFRESH_LEASE_SECONDS)
+    claimed = RecommendationState.objects.filter(student_id=student_id).filter(
+        Q(refresh_lease_until__isnull=True) | Q(refresh_lease_until__lt=now)
+    ).update(refresh_lease_until=until)
+    if claimed:
+        return True
+    try:
+        # First refresh: the row is created holding the lease, and filled in
+        # by rescore_and_record. The savepoint keeps a caller's transaction
+        # usable when another process created it first
+        with transaction.atomic(using=router.db_for_write(RecommendationState)):
+            RecommendationState.objects.create(student_id=student_id, profile_fingerprint='', catalog_version='',
+                                               refresh_lease_until=until)
+    except IntegrityError:
+        return False
+    return True
+
+def release_refresh(student_id):
+    RecommendationState.objects.filter(student_id=student_id).update(refresh_lease_until=None)
+
+def wait_for_refresh(student_id):
+    """
+    Wait for another process's refresh of a student to finish; returns the
+    resulting state, or None if the student's row is gone or the lease ran
+    out first
+    """
+    while True:
+        state = RecommendationState.objects.filter(student_id=student_id).first()
+        if state is None or state.refresh_lease_until is None:
+            return state
+        if state.refresh_lease_until < timezone.now():
+            return None
+        time.sleep(REFRESH_POLL_SECONDS)
+
+def current_stamp(profile):
+    """What a profile's stored recommendations must have been scored from to be current"""
+    return profile.scoring_fingerprint(next_expiry()), format_catalog_version(catalog_version())
+
+def rescore_and_record(profile, stamp):
+    """Rescore a student and record the stamp it was scored from, in one transaction"""
+    with transaction.atomic(using=router.db_for_write(RecommendationState)):
+        count = rescore_student(profile, stamp[1])
+        RecommendationState.objects.update_or_create(
+            student=profile,
+            defaults={
+                'profile_fingerprint': stamp[0],
+                'catalog_version': stamp[1],
+                'recommendation_count': count,
+            },
+        )
     return count
 
+def scoring_catalog(version=None):
+    """
+    Open scholarships to score against: from the compiled catalog file when
+    it was built from this catalog version (see compiled_catalog), else from
+    the database
+    """
+    today = timezone.now().date()
+    path = settings.SCORING_CATALOG_PATH
+    catalog = load_catalog(path) if path and version else None
+    if catalog is not None and catalog.version == version:
+        return catalog.active(today)
+    return Scholarship.objects.filter(deadline__gte=today)
+
+def rescore_student(profile, catalog_version=None):
+    """
+    Recompute and store every recommendation for a student profile
+    """
+    # Score before taking the write lock, then swap the rows in one go
+    recommendations = []
+    for scholarship in scoring_catalog(catalog_version):
+        recommendation = score_pair(profile, scholarship)
+        if recommendation is not None:
+            recommendations.append(recommendation)
+    
+    # Clears the existing recommendations and updates ScholarshipStats
+    replace_student_recommendations(profile, recommendations)
+    
+    return len(recommendations)
+
+def score_pair(profile, scholarship):
+    """
+    The recommendation of scholarship to a student, or None when the match
+    is too weak to store
+    """
+    match_score = calculate_match_score(profile, scholarship)
+    
+    # Create recommendation even with lower scores, but prioritize higher ones
+    if match_score <= 20:  # Lower threshold to get more recommendations
+        return None
+    return ScholarshipRecommendation(
+        student=profile,
+        scholarship_id=scholarship.id,
+        match_score=match_score,
+        reason=generate_recommendation_reason(profile, scholarship, match_score),
+        field_of_study=profile.field_of_study,
+    )
+
 def calculate_match_score(profile, scholarship):
     """
     Calculate match score between student profile and scholarship
@@ -193,21 +351,25 @@ def ensure_recommendations_exist(profile):
     
     if existing_count == 0:
         # If no recommendations exist, create some generic ones
-        all_scholarships = Scholarship.objects.all()[:5]  # Get first 5 scholarships
+        # Get first 5 open scholarships; closed ones are never recommended
+        open_scholarships = Scholarship.objects.filter(deadline__gte=timezone.now().date())[:5]
         
-        for i, scholarship in enumerate(all_scholarships):
+        recommendations = []
+        for i, scholarship in enumerate(open_scholarships):
             # Create recommendations with decreasing scores
             match_score = 80 - (i * 15)  # 80%, 65%, 50%, 35%, 20%
             if match_score < 20:
                 match_score = 20  # Minimum score
                 
-            ScholarshipRecommendation.objects.create(
+            recommendations.append(ScholarshipRecommendation(
                 student=profile,
                 scholarship=scholarship,
                 match_score=match_score,
-                reason=f"Recommended scholarship based on general criteria. Match score: {match_score}%"
-            )
+                reason=f"Recommended scholarship based on general criteria. Match score: {match_score}%",
+                field_of_study=profile.field_of_study,
+            ))
         
-        return all_scholarships.count()
+        add_recommendations(recommendations)
+        return len(recommendations)
     
     return existing_count
\ No newline at end of file
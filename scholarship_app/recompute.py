@@ -0,0 +1,164 @@
+"""
+Targeted recomputation queued from the admin.
+
+The admin actions only insert a RecomputeJob row, so saving never waits on
+scoring. Jobs are run by `manage.py run_recompute_jobs`, in batches of
+students, each batch in its own short write transaction:
+
+    scholarships  every student is rescored against just the selected
+                  scholarships; the rest of their recommendations stay
+    students      the selected students are rescored against every open
+                  scholarship, as a refresh would, under the same
+                  per-student lease and scoring slots
+
+Claiming a job is a single UPDATE ... WHERE status = 'pending', so any
+number of workers can poll the same queue. A worker records a heartbeat
+with every batch; a running job whose heartbeat is older than
+settings.RECOMPUTE_STALE_SECONDS is put back in the queue and starts over.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .catalog import catalog_version, format_catalog_version, next_expiry
+from .models import RecomputeJob, Scholarship, StudentProfile
+from .ratelimit import scoring_slot
+from .recommendation_engine.utils import claim_refresh, release_refresh, rescore_and_record, score_pair
+from .stats import replace_pair_recommendations
+
+logger = logging.getLogger(__name__)
+
+# Scholarship ids per DELETE ... IN (...) when replacing pairs
+ID_CHUNK_SIZE = 500
+
+
+def enqueue_recompute(kind, target_ids, requested_by=''):
+    """Queue a job for the given scholarship or student ids; returns it"""
+    target_ids = sorted(set(target_ids))
+    if kind == RecomputeJob.SCHOLARSHIPS:
+        total = StudentProfile.objects.count()
+    else:
+        total = len(target_ids)
+    return RecomputeJob.objects.create(kind=kind, target_ids=target_ids, total=total, requested_by=requested_by)
+
+
+class JobReclaimed(Exception):
+    """The job was requeued as stale while this worker was still running it"""
+
+
+def requeue_stale_jobs():
+    """Put running jobs whose worker stopped reporting back in the queue; returns how many"""
+    cutoff = timezone.now() - timedelta(seconds=settings.RECOMPUTE_STALE_SECONDS)
+    return RecomputeJob.objects.filter(status=RecomputeJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    ).update(status=RecomputeJob.PENDING, processed=0, pairs_scored=0, started_at=None, heartbeat_at=None)
+
+
+def claim_next_job():
+    """Mark the oldest pending job running and return it, or None when the queue is empty"""
+    requeue_stale_jobs()
+    while True:
+        job = RecomputeJob.objects.filter(status=RecomputeJob.PENDING).order_by('id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = RecomputeJob.objects.filter(pk=job.pk, status=RecomputeJob.PENDING).update(
+            status=RecomputeJob.RUNNING, started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _owned(job):
+    # started_at is set by each claim, so it tells this run from a later one
+    return RecomputeJob.objects.filter(pk=job.pk, status=RecomputeJob.RUNNING, started_at=job.started_at)
+
+
+def _record_progress(job, students, pairs):
+    updated = _owned(job).update(
+        processed=F('processed') + students, pairs_scored=F('pairs_scored') + pairs,
+        heartbeat_at=timezone.now(),
+    )
+    if not updated:
+        raise JobReclaimed()
+
+
+def _recompute_scholarships(job, batch_size, pause):
+    # Closed scholarships aren't scored, so their pairs are only removed
+    scholarships = list(Scholarship.objects.filter(id__in=job.target_ids, deadline__gte=timezone.now().date()))
+    last_id = 0
+    while True:
+        profiles = list(StudentProfile.objects.filter(id__gt=last_id).order_by('id')[:batch_size])
+        if not profiles:
+            return
+        recommendations = []
+        for profile in profiles:
+            for scholarship in scholarships:
+                recommendation = score_pair(profile, scholarship)
+                if recommendation is not None:
+                    recommendations.append(recommendation)
+        for start in range(0, len(job.target_ids), ID_CHUNK_SIZE):
+            chunk = set(job.target_ids[start:start + ID_CHUNK_SIZE])
+            replace_pair_recommendations(
+                [profile.pk for profile in profiles], sorted(chunk),
+                [recommendation for recommendation in recommendations if recommendation.scholarship_id in chunk],
+            )
+        _record_progress(job, len(profiles), len(profiles) * len(scholarships))
+        last_id = profiles[-1].id
+        time.sleep(pause)
+
+
+def _recompute_students(job, batch_size, pause):
+    for start in range(0, len(job.target_ids), batch_size):
+        batch = job.target_ids[start:start + batch_size]
+        version = format_catalog_version(catalog_version())
+        open_until = next_expiry()
+        open_scholarships = Scholarship.objects.filter(deadline__gte=timezone.now().date()).count()
+        # Students deleted since the job was queued are just counted as done
+        profiles = StudentProfile.objects.in_bulk(batch)
+        scored = 0
+        for profile in profiles.values():
+            # A student a request is refreshing right now is left to it
+            if not claim_refresh(profile.pk):
+                continue
+            try:
+                with scoring_slot(wait=True):
+                    rescore_and_record(profile, (profile.scoring_fingerprint(open_until), version))
+            finally:
+                release_refresh(profile.pk)
+            scored += 1
+        _record_progress(job, len(batch), scored * open_scholarships)
+        time.sleep(pause)
+
+
+def run_job(job, batch_size=None, pause=0):
+    """Run a claimed job to completion, recording how it ended"""
+    batch_size = batch_size or settings.RECOMPUTE_BATCH_SIZE
+    recompute = _recompute_scholarships if job.kind == RecomputeJob.SCHOLARSHIPS else _recompute_students
+    try:
+        recompute(job, batch_size, pause)
+    except JobReclaimed:
+        logger.warning('Recompute job %s was requeued as stale; leaving it to its new worker', job.pk)
+        return
+    except Exception:
+        logger.exception('Recompute job %s failed', job.pk)
+        status, error = RecomputeJob.FAILED, traceback.format_exc()
+    else:
+        status, error = RecomputeJob.DONE, ''
+    _owned(job).update(status=status, error=error, finished_at=timezone.now())
+
+
+def run_pending_jobs(batch_size=None, pause=0):
+    """Run queued jobs until none are left; returns how many ran"""
+    count = 0
+    while (job := claim_next_job()) is not None:
+        run_job(job, batch_size, pause)
+        count += 1
+    return count
+
@@ -0,0 +1,158 @@
+"""
+Retention jobs run by `manage.py apply_retention`.
+
+Every step deletes in small batches, each in its own short transaction
+with a pause in between, so request handlers waiting on the SQLite write
+lock get a turn between batches instead of stalling behind one long
+delete.
+
+Batches are selected before their transaction starts. Under WAL, a
+transaction that reads and then writes fails with "database is locked" if
+another connection committed in between, without waiting on busy_timeout;
+a transaction that starts with its write just waits for the lock.
+"""
+import time
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import (
+    ArchivedScholarship, RecommendationState, Scholarship, ScholarshipDeletion, ScholarshipFieldCount,
+    ScholarshipRecommendation, ScholarshipStats, StudentProfile,
+)
+from .stats import delete_student_recommendations, purge_scholarship_recommendations
+from .sync import SYNC_TOKEN_MAX_AGE
+
+# Live columns copied into the archive; the live id becomes scholarship_id
+ARCHIVED_FIELDS = tuple(
+    field.name for field in ArchivedScholarship._meta.concrete_fields
+    if field.name not in ('id', 'scholarship_id', 'archived_at')
+)
+DB_SESSION_ENGINES = ('django.contrib.sessions.backends.db', 'django.contrib.sessions.backends.cached_db')
+# Ids per IN (...) when matching rows across databases
+ID_CHUNK_SIZE = 500
+
+
+def run_in_batches(step, batch_size, pause):
+    """Call step(batch_size) until it handles less than a full batch; returns the total"""
+    total = 0
+    while True:
+        done = step(batch_size)
+        total += done
+        if done < batch_size:
+            return total
+        time.sleep(pause)
+
+
+def delete_in_batches(queryset, batch_size, pause):
+    """Delete the rows matched by queryset, batch_size primary keys at a time"""
+    model = queryset.model
+    using = router.db_for_write(model)
+
+    def step(batch_size):
+        pks = list(queryset.using(using).values_list('pk', flat=True)[:batch_size])
+        if pks:
+            model._base_manager.using(using).filter(pk__in=pks).delete()
+        return len(pks)
+
+    return run_in_batches(step, batch_size, pause)
+
+
+def archive_expired_scholarships(before, batch_size, pause):
+    """
+    Move scholarships with a deadline before `before` to ArchivedScholarship.
+
+    Deleting them runs the usual post_delete signals, so sync clients get
+    tombstones and their stats are dropped. Their recommendations are then
+    purged batch_size rows at a time.
+    """
+    using = router.db_for_write(Scholarship)
+
+    def step(batch_size):
+        expired = list(Scholarship.objects.using(using).filter(deadline__lt=before)
+                       .order_by('deadline', 'id')[:batch_size])
+        if not expired:
+            return 0
+        ids = [scholarship.id for scholarship in expired]
+        with transaction.atomic(using=using):
+            ArchivedScholarship.objects.using(using).bulk_create([
+                ArchivedScholarship(scholarship_id=scholarship.id,
+                                    **{name: getattr(scholarship, name) for name in ARCHIVED_FIELDS})
+                for scholarship in expired
+            ])
+            Scholarship.objects.using(using).filter(id__in=ids).delete()
+        time.sleep(pause)
+        run_in_batches(lambda limit: purge_scholarship_recommendations(ids, limit), batch_size, pause)
+        return len(expired)
+
+    return run_in_batches(step, batch_size, pause)
+
+
+def _missing_ids(model, ids):
+    """The ids in `ids` with no row in model's table"""
+    ids = list(ids)
+    existing = set()
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        existing.update(model.objects.filter(id__in=ids[start:start + ID_CHUNK_SIZE])
+                        .values_list('id', flat=True))
+    return set(ids) - existing
+
+
+def purge_orphaned_recommendations(batch_size, pause):
+    """
+    Delete recommendations and stats whose scholarship or student no
+    longer exists.
+
+    This is where recommendations of scholarships deleted outside
+    archive_expired_scholarships (e.g. in the admin) go. It also catches
+    rows the delete signals missed, e.g. deletes done while the
+    recommendations database was unavailable.
+    """
+    deleted = 0
+    # Scholarship deletes drop only the stats; their recommendations wait for this
+    missing = sorted(_missing_ids(
+        Scholarship, ScholarshipRecommendation.objects.values_list('scholarship_id', flat=True).distinct()
+    ))
+    for start in range(0, len(missing), ID_CHUNK_SIZE):
+        chunk = missing[start:start + ID_CHUNK_SIZE]
+        deleted += run_in_batches(lambda limit: purge_scholarship_recommendations(chunk, limit), batch_size, pause)
+
+    for model in (ScholarshipStats, ScholarshipFieldCount):
+        missing = sorted(_missing_ids(
+            Scholarship, model.objects.values_list('scholarship_id', flat=True).distinct()
+        ))
+        for start in range(0, len(missing), ID_CHUNK_SIZE):
+            queryset = model.objects.filter(scholarship_id__in=missing[start:start + ID_CHUNK_SIZE])
+            deleted += delete_in_batches(queryset, batch_size, pause)
+
+    # A student's rows go in one transaction so ScholarshipStats stays exact
+    student_ids = set(ScholarshipRecommendation.objects.values_list('student_id', flat=True).distinct())
+    student_ids.update(RecommendationState.objects.values_list('student_id', flat=True))
+    for student_id in sorted(_missing_ids(StudentProfile, student_ids)):
+        deleted += ScholarshipRecommendation.objects.filter(student_id=student_id).count()
+        delete_student_recommendations([student_id])
+        time.sleep(pause)
+    return deleted
+
+
+def clear_expired_sessions(batch_size, pause):
+    engine = settings.SESSION_ENGINE
+    if engine not in DB_SESSION_ENGINES:
+        # Cache and signed-cookie sessions expire on their own; file sessions
+        # have no batched form
+        import_module(engine).SessionStore.clear_expired()
+        return 0
+    return delete_in_batches(Session.objects.filter(expire_date__lt=timezone.now()), batch_size, pause)
+
+
+def prune_sync_tombstones(batch_size, pause):
+    """
+    Drop deletion tombstones older than any sync token can be; a client
+    with an older token has to resync from scratch anyway
+    """
+    cutoff = timezone.now() - timedelta(seconds=SYNC_TOKEN_MAX_AGE)
+    return delete_in_batches(ScholarshipDeletion.objects.filter(deleted_at__lt=cutoff), batch_size, pause)
@@ -0,0 +1,160 @@
+"""
+Database routing.
+
+RecommendationsRouter keeps the high-churn recommendation tables in their
+own database (settings.RECOMMENDATIONS_DATABASE) so rescoring bursts don't
+lock out logins and catalog reads. Those models reference profiles and
+scholarships without database constraints; cleanup on delete is done by
+signals, and scholarships are attached in Python rather than joined.
+
+Read replica routing:
+
+ReplicaRoutingMiddleware marks GET/HEAD requests to the views named in
+settings.REPLICA_VIEWS; while such a request runs, ReplicaRouter sends this
+app's reads to settings.REPLICA_DATABASE. All writes go to the default
+database. A session that writes is pinned to the primary for
+REPLICA_STICKY_SECONDS, so students see their own changes before the next
+replica snapshot. Without a replica alias in DATABASES nothing is routed.
+"""
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ROUTED_APP_LABEL = 'scholarship_app'
+PINNED_SESSION_KEY = '_db_pinned_until'
+
+_routing = ContextVar('scholarship_app_routing', default=None)
+
+
+class RequestRouting:
+    """Per-request routing state; mutated in place so sync_to_async threads share it"""
+
+    def __init__(self):
+        self.read_alias = None
+        self.wrote = False
+
+
+def replica_alias():
+    alias = settings.REPLICA_DATABASE
+    return alias if alias in settings.DATABASES else None
+
+
+# Models stored in the recommendations database
+RECOMMENDATION_MODELS = {
+    'scholarshiprecommendation', 'recommendationstate', 'scholarshipstats', 'scholarshipfieldcount',
+    'recomputejob',
+}
+
+
+def is_recommendation_model(app_label, model_name):
+    return app_label == ROUTED_APP_LABEL and model_name in RECOMMENDATION_MODELS
+
+
+class RecommendationsRouter:
+    def _db_for_model(self, model, instance=None):
+        if is_recommendation_model(model._meta.app_label, model._meta.model_name):
+            return settings.RECOMMENDATIONS_DATABASE
+        # Related objects of a recommendation (recommendation.student) are
+        # in the main database, not where the instance came from
+        if instance is not None and is_recommendation_model(instance._meta.app_label, instance._meta.model_name):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Recommendations point at profiles and scholarships in the main database
+        if any(is_recommendation_model(obj._meta.app_label, obj._meta.model_name) for obj in (obj1, obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if is_recommendation_model(app_label, model_name):
+            return db == settings.RECOMMENDATIONS_DATABASE
+        if db == settings.RECOMMENDATIONS_DATABASE:
+            return False
+        return None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is not None and state.read_alias and model._meta.app_label == ROUTED_APP_LABEL:
+            return state.read_alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None and model._meta.app_label == ROUTED_APP_LABEL:
+            state.wrote = True
+        # Objects read from the replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        same_data = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        if obj1._state.db in same_data and obj2._state.db in same_data:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary, schema included
+        if db == settings.REPLICA_DATABASE:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RequestRouting()
+        token = _routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        self.pin_after_write(request, state)
+        return response
+
+    async def __acall__(self, request):
+        state = RequestRouting()
+        token = _routing.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if state.wrote:
+            await sync_to_async(self.pin_after_write)(request, state)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _routing.get()
+        alias = replica_alias()
+        if (
+            state is not None
+            and alias
+            and request.method in ('GET', 'HEAD')
+            and request.resolver_match.url_name in settings.REPLICA_VIEWS
+            and request.session.get(PINNED_SESSION_KEY, 0) < time.time()
+        ):
+            state.read_alias = alias
+        return None
+
+    def pin_after_write(self, request, state):
+        if state.wrote:
+            request.session[PINNED_SESSION_KEY] = time.time() + settings.REPLICA_STICKY_SECONDS
@@ -0,0 +1,184 @@
+import re
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+
+FTS_TABLE = 'scholarship_app_scholarship_fts'
+CONTENT_TABLE = 'scholarship_app_scholarship'
+FTS_COLUMNS = ('title', 'provider', 'description', 'eligibility')
+
+# bm25() column weights, in FTS_COLUMNS order: a hit in the title counts most
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+# Private-use markers so snippets can be HTML-escaped before highlighting
+_MARK_START, _MARK_END = '\ue000', '\ue001'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SearchHit = namedtuple('SearchHit', ['id', 'rank', 'snippet'])
+
+
+def _columns(prefix=''):
+    return ', '.join(f'{prefix}{column}' for column in FTS_COLUMNS)
+
+
+def install_search_index(schema_connection=None):
+    """
+    Create the FTS5 index and the triggers that keep it in sync.
+
+    Safe to run repeatedly. Django rebuilds SQLite tables on some schema
+    changes, which drops their triggers, so migrations touching the
+    scholarship table call this again afterwards.
+    """
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor != 'sqlite':
+        return
+
+    statements = [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {_columns()},
+            content='{CONTENT_TABLE}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {CONTENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_columns()}) VALUES (new.id, {_columns('new.')});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {CONTENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns()}) VALUES ('delete', old.id, {_columns('old.')});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {_columns()} ON {CONTENT_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns()}) VALUES ('delete', old.id, {_columns('old.')});
+            INSERT INTO {FTS_TABLE}(rowid, {_columns()}) VALUES (new.id, {_columns('new.')});
+        END""",
+    ]
+    with schema_connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(schema_connection=None):
+    schema_connection = schema_connection or connection
+    if schema_connection.vendor != 'sqlite':
+        return
+
+    with schema_connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def rebuild_search_index(schema_connection=None):
+    """Re-read every row from the scholarship table and merge the index"""
+    schema_connection = schema_connection or connection
+    install_search_index(schema_connection)
+    if schema_connection.vendor != 'sqlite':
+        return
+
+    with schema_connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+_available = {}
+
+
+def is_search_available():
+    if connection.vendor != 'sqlite':
+        return False
+
+    # Only remember a positive answer; the index may be installed later
+    name = connection.settings_dict['NAME']
+    if not _available.get(name):
+        _available[name] = FTS_TABLE in connection.introspection.table_names(include_views=True)
+    return _available[name]
+
+
+async def ais_search_available():
+    """is_search_available() for async views; introspection can't run on the event loop"""
+    return await sync_to_async(is_search_available)()
+
+
+def build_match_query(text):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word is quoted so FTS operators in user input are inert; the
+    last word is a prefix match so results update while typing.
+    """
+    tokens = _TOKEN_RE.findall(text or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def filter_by_search(queryset, text, search_available=None):
+    """
+    Restrict a Scholarship queryset to rows matching ``text``.
+
+    Async callers pass ``search_available`` from ais_search_available(),
+    since checking for the index queries the database.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return queryset
+
+    if search_available is None:
+        search_available = is_search_available()
+    if not search_available:
+        for token in _TOKEN_RE.findall(text):
+            queryset = queryset.filter(Q(title__icontains=token) | Q(provider__icontains=token))
+        return queryset
+
+    return queryset.filter(id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,)))
+
+
+def search_rank(text, search_available=None):
+    """
+    Expression for the BM25 rank of each scholarship against ``text``, lower
+    being a better match, to annotate rows filter_by_search() kept. Without
+    the index every row ranks the same.
+    """
+    match = build_match_query(text)
+    if search_available is None:
+        search_available = is_search_available()
+    if match is None or not search_available:
+        return Value(0.0, output_field=FloatField())
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    return RawSQL(
+        f'SELECT bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} '
+        f'WHERE {FTS_TABLE} MATCH %s AND rowid = "{CONTENT_TABLE}"."id"',
+        (match,), output_field=FloatField(),
+    )
+
+
+def _render_snippet(raw):
+    return escape(raw).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_scholarships(text, limit=20):
+    """BM25-ranked matches with a highlighted description snippet"""
+    match = build_match_query(text)
+    if match is None or not is_search_available():
+        return []
+
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    description_column = FTS_COLUMNS.index('description')
+    sql = f"""
+        SELECT rowid, bm25({FTS_TABLE}, {weights}) AS rank,
+               snippet({FTS_TABLE}, {description_column}, %s, %s, '…', 16)
+        FROM {FTS_TABLE}
+        WHERE {FTS_TABLE} MATCH %s
+        ORDER BY rank
+        LIMIT %s
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (_MARK_START, _MARK_END, match, limit))
+        rows = cursor.fetchall()
+
+    return [SearchHit(row_id, rank, _render_snippet(snippet)) for row_id, rank, snippet in rows]
@@ -0,0 +1,41 @@
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from . import stats
+from .models import (
+    Scholarship, ScholarshipDeletion, StudentProfile, ForumTopic, ForumReply,
+)
+
+
+@receiver(post_delete, sender=Scholarship)
+def record_scholarship_deletion(sender, instance, **kwargs):
+    ScholarshipDeletion.objects.create(scholarship_id=instance.pk)
+
+
+# Recommendations live in another database, so deletes don't cascade to them
+
+@receiver(post_delete, sender=Scholarship)
+def delete_scholarship_stats(sender, instance, **kwargs):
+    # A popular scholarship has a recommendation per student; those are
+    # purged in batches by `manage.py apply_retention`, not inside this
+    # delete's transaction. Views already skip rows whose scholarship is gone.
+    stats.delete_scholarship_stats([instance.pk])
+
+
+@receiver(post_delete, sender=StudentProfile)
+def delete_student_recommendations(sender, instance, **kwargs):
+    # Also takes the student's rows out of ScholarshipStats
+    stats.delete_student_recommendations([instance.pk])
+
+
+@receiver(post_delete, sender=ForumReply)
+def update_topic_after_reply_deleted(sender, instance, **kwargs):
+    # Runs inside the deletion's transaction, for single and bulk deletes
+    latest_reply = (ForumReply.objects.filter(topic=OuterRef('pk'))
+                    .order_by('-created_at').values('created_at')[:1])
+    ForumTopic.objects.filter(pk=instance.topic_id).update(
+        reply_count=F('reply_count') - 1,
+        last_activity_at=Coalesce(Subquery(latest_reply), F('created_at')),
+    )
@@ -0,0 +1,36 @@
+"""
+Connection setup for SQLite: applies settings.SQLITE_PRAGMAS to every new
+connection (see the connection_created hookup in apps.py).
+"""
+import re
+
+from django.conf import settings
+
+_PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def pragma_statements(pragmas):
+    # busy_timeout goes first so switching the journal mode waits for locks
+    # held by other processes instead of failing
+    names = sorted(pragmas, key=lambda name: name != 'busy_timeout')
+    for name in names:
+        if not _PRAGMA_NAME.match(name):
+            raise ValueError(f'Invalid SQLite pragma name: {name!r}')
+        yield f'PRAGMA {name} = {pragmas[name]}'
+
+
+def apply_pragmas(connection, pragmas):
+    """Run ``pragmas`` ({name: value}) on a raw sqlite3 connection"""
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement)
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if connection.is_in_memory_db():
+        # Test databases live in memory, where WAL and mmap don't apply
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+    apply_pragmas(connection.connection, pragmas)
@@ -0,0 +1,250 @@
+"""
+Incremental maintenance of ScholarshipStats and ScholarshipFieldCount.
+
+Every write to a student's recommendations goes through this module and
+applies the net change (rows removed and added) to the per-scholarship
+counters with UPDATE ... SET column = column + delta, in the same
+transaction as the recommendation rows. A rescore that reproduces the
+same scores touches no counters. `manage.py reconcile_scholarship_stats`
+rebuilds everything from the recommendation rows if they ever drift.
+"""
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import (
+    RecommendationState, ScholarshipFieldCount, ScholarshipRecommendation, ScholarshipStats,
+    StudentProfile,
+)
+
+SCORE_PLACES = Decimal('0.01')
+
+
+def score_column(score):
+    column = ScholarshipStats.SCORE_BUCKETS[0][1]
+    for lower, name in ScholarshipStats.SCORE_BUCKETS:
+        if score >= lower:
+            column = name
+    return column
+
+
+def stats_database():
+    return router.db_for_write(ScholarshipStats)
+
+
+def delete_recommendations(using, limit=None, **columns):
+    """
+    Delete the recommendations whose columns ('student_id',
+    'scholarship_id') are all in the given values, at most `limit` of
+    them, returning the removed rows as (student_id, scholarship_id,
+    match_score, field_of_study).
+
+    DELETE ... RETURNING removes and reads in one statement, so it can open
+    the caller's transaction: under WAL a transaction that reads first and
+    writes later fails when another write commits in between.
+    """
+    if not all(columns.values()):
+        return []
+    table = ScholarshipRecommendation._meta.db_table
+    conditions, params = [], []
+    for column, values in columns.items():
+        conditions.append(f'"{column}" IN ({", ".join(["%s"] * len(values))})')
+        params.extend(values)
+    where = " AND ".join(conditions)
+    if limit is not None:
+        where = f'"id" IN (SELECT "id" FROM "{table}" WHERE {where} LIMIT %s)'
+        params.append(limit)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM "{table}" WHERE {where} '
+            f'RETURNING "student_id", "scholarship_id", "match_score", "field_of_study"',
+            params,
+        )
+        return [
+            (student_id, scholarship_id, Decimal(str(score)).quantize(SCORE_PLACES), field_of_study)
+            for student_id, scholarship_id, score, field_of_study in cursor.fetchall()
+        ]
+
+
+def apply_recommendation_changes(removed, added, using):
+    """
+    Apply removed and added (student_id, scholarship_id, match_score,
+    field_of_study) rows to the counters. Call inside the transaction that changed the
+    recommendations.
+    """
+    totals = defaultdict(Counter)
+    fields = Counter()
+    for sign, rows in ((-1, removed), (1, added)):
+        for _student_id, scholarship_id, score, field_of_study in rows:
+            deltas = totals[scholarship_id]
+            deltas['recommendation_count'] += sign
+            deltas['score_total'] += sign * Decimal(score)
+            deltas[score_column(score)] += sign
+            if field_of_study:
+                fields[scholarship_id, field_of_study] += sign
+
+    for scholarship_id, deltas in totals.items():
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            continue
+        updated = ScholarshipStats.objects.using(using).filter(scholarship_id=scholarship_id).update(
+            **{name: F(name) + delta for name, delta in deltas.items()}
+        )
+        # No row and a net removal: the scholarship was deleted and its stats
+        # with it, while its recommendations wait for apply_retention
+        if not updated and deltas.get('recommendation_count', 0) > 0:
+            ScholarshipStats.objects.using(using).create(scholarship_id=scholarship_id, **deltas)
+
+    emptied = []
+    for (scholarship_id, field_of_study), delta in fields.items():
+        if not delta:
+            continue
+        counts = ScholarshipFieldCount.objects.using(using).filter(
+            scholarship_id=scholarship_id, field_of_study=field_of_study
+        )
+        if not counts.update(recommendation_count=F('recommendation_count') + delta):
+            if delta < 0:
+                continue
+            ScholarshipFieldCount.objects.using(using).create(
+                scholarship_id=scholarship_id, field_of_study=field_of_study, recommendation_count=delta,
+            )
+        elif delta < 0:
+            emptied.append(scholarship_id)
+    if emptied:
+        ScholarshipFieldCount.objects.using(using).filter(
+            scholarship_id__in=emptied, recommendation_count__lte=0
+        ).delete()
+
+
+def recommendation_rows(recommendations):
+    return [
+        (recommendation.student_id, recommendation.scholarship_id, Decimal(recommendation.match_score).quantize(SCORE_PLACES),
+         recommendation.field_of_study)
+        for recommendation in recommendations
+    ]
+
+
+def replace_student_recommendations(profile, recommendations):
+    """Swap a student's stored recommendations for new ones and update the counters"""
+    using = router.db_for_write(ScholarshipRecommendation)
+    with transaction.atomic(using=using):
+        removed = delete_recommendations(using, student_id=[profile.pk])
+        ScholarshipRecommendation.objects.using(using).bulk_create(recommendations)
+        apply_recommendation_changes(removed, recommendation_rows(recommendations), using)
+
+
+def add_recommendations(recommendations):
+    using = router.db_for_write(ScholarshipRecommendation)
+    with transaction.atomic(using=using):
+        ScholarshipRecommendation.objects.using(using).bulk_create(recommendations)
+        apply_recommendation_changes([], recommendation_rows(recommendations), using)
+
+
+def replace_pair_recommendations(student_ids, scholarship_ids, recommendations):
+    """
+    Swap the stored recommendations for just these students x scholarships
+    for new ones, keeping the counters and each student's
+    RecommendationState.recommendation_count exact
+    """
+    using = router.db_for_write(ScholarshipRecommendation)
+    with transaction.atomic(using=using):
+        removed = delete_recommendations(using, student_id=student_ids, scholarship_id=scholarship_ids)
+        ScholarshipRecommendation.objects.using(using).bulk_create(recommendations)
+        added = recommendation_rows(recommendations)
+        apply_recommendation_changes(removed, added, using)
+        apply_student_count_changes(removed, added, using)
+    return len(removed), len(added)
+
+
+def apply_student_count_changes(removed, added, using):
+    """Keep RecommendationState.recommendation_count in step with rows removed and added"""
+    per_student = Counter()
+    for sign, rows in ((-1, removed), (1, added)):
+        for student_id, *_ in rows:
+            per_student[student_id] += sign
+    for student_id, delta in per_student.items():
+        if delta:
+            RecommendationState.objects.using(using).filter(student_id=student_id).update(
+                recommendation_count=F('recommendation_count') + delta
+            )
+
+
+def purge_scholarship_recommendations(scholarship_ids, limit):
+    """
+    Delete up to `limit` recommendations of deleted scholarships in one
+    short transaction; returns how many went. Run it until it returns less
+    than `limit` (see retention.run_in_batches).
+    """
+    using = router.db_for_write(ScholarshipRecommendation)
+    with transaction.atomic(using=using):
+        removed = delete_recommendations(using, limit=limit, scholarship_id=scholarship_ids)
+        # The scholarships' stats rows went with them (see signals), and
+        # removals don't recreate missing rows, so this leaves them gone
+        apply_recommendation_changes(removed, [], using)
+        apply_student_count_changes(removed, [], using)
+    return len(removed)
+
+
+def delete_student_recommendations(student_ids):
+    """Remove students' recommendations, counters and refresh state"""
+    using = router.db_for_write(ScholarshipRecommendation)
+    with transaction.atomic(using=using):
+        removed = delete_recommendations(using, student_id=student_ids)
+        apply_recommendation_changes(removed, [], using)
+        RecommendationState.objects.using(using).filter(student_id__in=student_ids).delete()
+
+
+def delete_scholarship_stats(scholarship_ids):
+    using = stats_database()
+    with transaction.atomic(using=using):
+        ScholarshipStats.objects.using(using).filter(scholarship_id__in=scholarship_ids).delete()
+        ScholarshipFieldCount.objects.using(using).filter(scholarship_id__in=scholarship_ids).delete()
+
+
+def backfill_fields_of_study(batch_size=500):
+    """Fill field_of_study on recommendations scored before it was recorded; returns rows updated"""
+    using = router.db_for_write(ScholarshipRecommendation)
+    student_ids = list(ScholarshipRecommendation.objects.using(using).filter(field_of_study='')
+                       .values_list('student_id', flat=True).distinct())
+    updated = 0
+    for start in range(0, len(student_ids), batch_size):
+        profiles = StudentProfile.objects.in_bulk(student_ids[start:start + batch_size])
+        for student_id, profile in profiles.items():
+            if profile.field_of_study:
+                updated += ScholarshipRecommendation.objects.using(using).filter(
+                    student_id=student_id, field_of_study=''
+                ).update(field_of_study=profile.field_of_study[:100])
+    return updated
+
+
+def rebuild_scholarship_stats(batch_size=1000):
+    """Recompute every counter from the recommendation rows; returns (scholarships, field rows)"""
+    using = stats_database()
+    bucket_counts = {}
+    for index, (lower, column) in enumerate(ScholarshipStats.SCORE_BUCKETS):
+        bucket = Q(match_score__gte=lower)
+        if index + 1 < len(ScholarshipStats.SCORE_BUCKETS):
+            bucket &= Q(match_score__lt=ScholarshipStats.SCORE_BUCKETS[index + 1][0])
+        bucket_counts[column] = Count('id', filter=bucket)
+
+    with transaction.atomic(using=using):
+        # Deletes first: the transaction takes the write lock before reading
+        ScholarshipStats.objects.using(using).all().delete()
+        ScholarshipFieldCount.objects.using(using).all().delete()
+
+        totals = (ScholarshipRecommendation.objects.using(using).order_by()
+                  .values('scholarship_id')
+                  .annotate(recommendation_count=Count('id'), score_total=Sum('match_score'), **bucket_counts))
+        ScholarshipStats.objects.using(using).bulk_create(
+            (ScholarshipStats(**row) for row in totals.iterator()), batch_size=batch_size
+        )
+        fields = (ScholarshipRecommendation.objects.using(using).exclude(field_of_study='').order_by()
+                  .values('scholarship_id', 'field_of_study')
+                  .annotate(recommendation_count=Count('id')))
+        ScholarshipFieldCount.objects.using(using).bulk_create(
+            (ScholarshipFieldCount(**row) for row in fields.iterator()), batch_size=batch_size
+        )
+        return (ScholarshipStats.objects.using(using).count(),
+                ScholarshipFieldCount.objects.using(using).count())
@@ -0,0 +1,75 @@
+import gzip
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional, gzip copies are always written
+    brotli = None
+
+# Widths of the WebP variants built by `manage.py build_image_variants`
+IMAGE_VARIANT_WIDTHS = (480, 960, 1600)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map')
+
+
+def variant_name(path, width):
+    """images/hero.png -> images/hero.960w.webp"""
+    root, _ = posixpath.splitext(path)
+    return f'{root}.{width}w.webp'
+
+
+class OptimizedStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Content-hashed static files with precompressed .gz (and .br when the
+    brotli package is installed) copies of text assets.
+
+    Hashed names never change content, so the web server can serve
+    STATIC_ROOT with far-future expiry (e.g. "expires max" in nginx) and
+    pick the precompressed copy with gzip_static / brotli_static.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Before collectstatic has run (tests, fresh checkouts) there is no
+        # manifest or hashed copy; fall back to the plain name
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            for compressed_name in self._write_compressed(name):
+                yield name, compressed_name, True
+
+    def _write_compressed(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            content = source.read()
+
+        compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+
+        for suffix, compress in compressors:
+            compressed = compress(content)
+            # Tiny files can grow when compressed; the server falls back to the original
+            if len(compressed) >= len(content):
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            yield name + suffix
+
+
+def variants_root():
+    return os.fspath(settings.STATIC_VARIANTS_ROOT)
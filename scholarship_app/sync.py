@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.core import signing
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from .models import Scholarship, ScholarshipDeletion
+from .pagination import keyset_filter
+
+SYNC_TOKEN_SALT = 'scholarship_app.sync'
+# Tombstones older than this may be pruned, so older tokens need a full resync
+SYNC_TOKEN_MAX_AGE = 60 * 60 * 24 * 30
+
+SYNC_FIELDS = (
+    'id', 'title', 'provider', 'amount', 'deadline', 'description', 'eligibility',
+    'application_process', 'website', 'scholarship_type', 'education_level', 'updated_at',
+)
+SYNC_ORDERING = ('updated_at', 'id')
+# updated_at is stamped when a row is saved, not when its transaction
+# commits, so a slow writer can commit a change older than rows a client
+# already has. A caught-up client resumes this far back; clients upsert, so
+# the rows sent again are harmless. Tombstone ids are handed out under
+# SQLite's write lock and so never commit out of order
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+class ExpiredSyncToken(InvalidSyncToken):
+    pass
+
+
+def make_sync_token(updated_at, scholarship_id, deletion_id, caught_up=False):
+    return signing.dumps({
+        'u': updated_at.isoformat() if updated_at else None,
+        'i': scholarship_id,
+        'd': deletion_id,
+        'c': caught_up,
+    }, salt=SYNC_TOKEN_SALT, compress=True)
+
+
+def read_sync_token(token):
+    """Return (updated_at, scholarship_id, deletion_id, caught_up) for a token"""
+    try:
+        data = signing.loads(token, salt=SYNC_TOKEN_SALT, max_age=SYNC_TOKEN_MAX_AGE)
+    except signing.SignatureExpired:
+        raise ExpiredSyncToken("Sync token has expired, start a full sync")
+    except signing.BadSignature:
+        raise InvalidSyncToken("Invalid sync token")
+
+    try:
+        updated_at = parse_datetime(data['u']) if data['u'] else None
+        # Tokens from before the overlap window count as caught up, so they look back too
+        return updated_at, data['i'], int(data['d']), bool(data.get('c', True))
+    except (KeyError, TypeError, ValueError):
+        raise InvalidSyncToken("Invalid sync token")
+
+
+def get_changes(token=None, limit=200):
+    """
+    Scholarships created or updated after ``token`` plus ids deleted since.
+
+    Without a token this is an initial sync: every scholarship is returned
+    (across as many pages as needed) and no tombstones, since the client
+    has nothing to delete yet.
+
+    Pages follow each other exactly; once a page leaves the client caught
+    up, the next call starts SYNC_OVERLAP before the newest change it has,
+    and may return rows the client already holds.
+    """
+    if token:
+        updated_at, last_id, deletion_id, caught_up = read_sync_token(token)
+    else:
+        updated_at, last_id, caught_up = None, None, False
+        deletion_id = ScholarshipDeletion.objects.aggregate(last=Max('id'))['last'] or 0
+
+    changes = Scholarship.objects.order_by(*SYNC_ORDERING)
+    if updated_at is not None:
+        if caught_up:
+            changes = changes.filter(updated_at__gte=updated_at - SYNC_OVERLAP)
+        else:
+            changes = changes.filter(keyset_filter(SYNC_ORDERING, [updated_at, last_id]))
+    changes = list(changes.values(*SYNC_FIELDS)[:limit + 1])
+
+    deletions = list(ScholarshipDeletion.objects.filter(id__gt=deletion_id)
+                     .order_by('id').values_list('id', 'scholarship_id')[:limit + 1])
+
+    has_more = len(changes) > limit or len(deletions) > limit
+    changes = changes[:limit]
+    deletions = deletions[:limit]
+
+    if changes:
+        updated_at, last_id = changes[-1]['updated_at'], changes[-1]['id']
+    if deletions:
+        deletion_id = deletions[-1][0]
+
+    return {
+        'changes': changes,
+        'deleted': [scholarship_id for _, scholarship_id in deletions],
+        'next_token': make_sync_token(updated_at, last_id, deletion_id, caught_up=not has_more),
+        'has_more': has_more,
+    }
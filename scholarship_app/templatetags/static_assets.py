@@ -0,0 +1,44 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+from scholarship_app.storage import IMAGE_VARIANT_WIDTHS, variant_name
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def available_variants(path):
+    """(url, width) pairs for the WebP variants that have been built"""
+    return tuple(
+        (static(variant_name(path, width)), width)
+        for width in IMAGE_VARIANT_WIDTHS
+        if finders.find(variant_name(path, width))
+    )
+
+
+@register.simple_tag
+def responsive_image(path, alt, sizes='100vw', css_class='', lazy=True):
+    """
+    <picture> with a WebP srcset from `build_image_variants`, falling back
+    to the original image for browsers without WebP or before a build
+    """
+    variants = available_variants(path)
+    img = format_html(
+        '<img src="{}" alt="{}"{}{} decoding="async">',
+        static(path),
+        alt,
+        format_html(' class="{}"', css_class) if css_class else '',
+        format_html(' loading="lazy"') if lazy else '',
+    )
+    if not variants:
+        return img
+
+    srcset = ', '.join(f'{url} {width}w' for url, width in variants)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">{}</picture>',
+        srcset, sizes, img,
+    )
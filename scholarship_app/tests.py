@@ -1,3 +1,891 @@
-from django.test import TestCase
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import IntegrityError, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
+
+from . import async_views, exports, ratelimit, recompute, search, sync, urls, views
+from .catalog import catalog_version, format_catalog_version
+from .models import (
+    ArchivedScholarship, ForumReply, ForumTopic, RecomputeJob, Scholarship, ScholarshipDeletion,
+    ScholarshipFieldCount, ScholarshipRecommendation, ScholarshipStats, Signup, StudentProfile,
+)
+from .recommendation_engine import utils
+from .recommendation_engine.compiled_catalog import load_catalog
+from .recommendation_engine.singleflight import SingleFlight
+from .recommendation_engine.utils import claim_refresh
+from .stats import (
+    add_recommendations, delete_student_recommendations, purge_scholarship_recommendations, rebuild_scholarship_stats,
+    replace_pair_recommendations, replace_student_recommendations,
+)
+
+# A plan step that reads a whole table without an index, e.g. "SCAN scholarship_app_scholarship"
+FULL_SCAN = re.compile(r'^SCAN (\S+)$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def walks_primary_key(sql, table):
+    """A LIMITed read in id order walks the table's own B-tree, which SQLite reports as a SCAN"""
+    return f'ORDER BY "{table}"."id" ASC' in sql and ' LIMIT ' in sql
+
+
+# The replica is a copy of the same schema, so plans are checked on the primary
+@override_settings(REPLICA_VIEWS=())
+class QueryPlanTests(TestCase):
+    """
+    Run the hot pages and APIs, EXPLAIN QUERY PLAN every SELECT they issue
+    and fail when one reads a table without an index or sorts in a temp
+    B-tree. A failure here usually means a new filter or ordering needs an
+    index in models.py.
+    """
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.signup = Signup.objects.create(name='Asha', email='asha@example.com', password='x')
+        cls.profile = StudentProfile.objects.create(
+            user=cls.signup, education_level='undergraduate', field_of_study='Engineering',
+        )
+        types = [value for value, _ in Scholarship.SCHOLARSHIP_TYPES]
+        for i in range(30):
+            scholarship = Scholarship.objects.create(
+                title=f'Scholarship {i}', provider='Provider', amount=1000 + i * 100,
+                deadline=date.today() + timedelta(days=i), description='Description',
+                eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type=types[i % len(types)],
+                education_level='undergraduate',
+            )
+            ScholarshipRecommendation.objects.create(
+                student=cls.profile, scholarship=scholarship, match_score=50 + i, reason='Match',
+            )
+        cls.topic = ForumTopic.objects.create(user=cls.signup, title='Topic', content='Content')
+        for i in range(25):
+            ForumReply.objects.create(user=cls.signup, topic=cls.topic, content=f'Reply {i}')
+
+    def setUp(self):
+        for alias in ('default', 'fragments', 'pages'):
+            caches[alias].clear()
+
+    def log_in(self):
+        session = self.client.session
+        session['user_id'] = self.signup.id
+        session.save()
+
+    def assertIndexedQueries(self, path, data=None, allow_sort=False):
+        """GET path and check the plan of every SELECT it runs; returns the response"""
+        with ExitStack() as stack:
+            captures = {
+                alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in self.databases
+            }
+            response = self.client.get(path, data)
+        self.assertEqual(response.status_code, 200, path)
+
+        selects = [
+            (alias, query['sql']) for alias, captured in captures.items()
+            for query in captured.captured_queries if query['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects, f'{path} ran no queries')
+        for alias, sql in selects:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            for step in plan:
+                if not allow_sort:
+                    self.assertNotIn(TEMP_SORT, step, f'{path} sorts without an index:\n{sql}\n{plan}')
+                scan = FULL_SCAN.match(step)
+                if scan and not walks_primary_key(sql, scan.group(1)):
+                    self.fail(f'{path} scans a table:\n{sql}\n{plan}')
+        return response
+
+    def test_scholarship_listing(self):
+        self.log_in()
+        for params in [
+            {},
+            {'sort': 'deadline_asc'},
+            {'sort': 'amount_desc'},
+            {'sort': 'amount_asc', 'min_amount': 1500},
+            {'type': 'merit'},
+            {'type': 'need', 'sort': 'amount_desc'},
+            {'education': 'undergraduate', 'sort': 'amount_asc'},
+            {'deadline_within': 10},
+        ]:
+            response = self.assertIndexedQueries('/scholarships/', params)
+            if response.context['next_query']:
+                self.assertIndexedQueries('/scholarships/?' + response.context['next_query'])
+
+        # Recommended ids come from the recommendations database as a list;
+        # sorting that set is bounded by the student's recommendation count
+        self.assertIndexedQueries('/scholarships/', {'recommended': 'on'}, allow_sort=True)
+
+        # Search results are sorted by rank, bounded by the number of matches
+        response = self.assertIndexedQueries('/scholarships/', {'q': 'Scholarship'}, allow_sort=True)
+        self.assertIndexedQueries('/scholarships/?' + response.context['next_query'], allow_sort=True)
+
+    def test_recommendations(self):
+        self.log_in()
+        self.assertIndexedQueries('/recommendations/')
+        self.assertIndexedQueries('/')
+
+    def test_forum(self):
+        self.assertIndexedQueries('/forum/')
+        response = self.assertIndexedQueries(f'/forum/{self.topic.id}/')
+        self.assertIndexedQueries(f'/forum/{self.topic.id}/', {'cursor': response.context['next_cursor']})
+
+    def test_scholarship_api(self):
+        response = self.assertIndexedQueries('/api/scholarships/', {'limit': 10})
+        self.assertIndexedQueries(response.json()['next'])
+        self.assertIndexedQueries('/api/scholarships/', {'scholarship_type': 'merit', 'limit': 5})
+        self.assertIndexedQueries('/api/scholarships/', {'citizenship': 'India', 'field_of_study': 'Law'})
+
+    def test_scholarship_sync(self):
+        response = self.assertIndexedQueries('/api/scholarships/sync/', {'limit': 10})
+        self.assertIndexedQueries('/api/scholarships/sync/', {'since': response.json()['next_token']})
+        response = self.assertIndexedQueries('/api/scholarships/sync/')
+        self.assertFalse(response.json()['has_more'])
+        self.assertIndexedQueries('/api/scholarships/sync/', {'since': response.json()['next_token']})
+
+
+ASYNC_READ_VIEWS = ('home', 'scholarships', 'recommendations', 'api_scholarships')
+
+
+class AsyncUrls:
+    """The app's URLs as settings.ASYNC_VIEWS=1 routes them; urls.py picks its views at import"""
+    urlpatterns = [
+        path(str(pattern.pattern),
+             getattr(async_views, pattern.name) if pattern.name in ASYNC_READ_VIEWS else pattern.callback,
+             name=pattern.name)
+        for pattern in urls.urlpatterns
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncUrls, REPLICA_VIEWS=())
+class AsyncViewTests(TestCase):
+    """Requests through the async views, which must not touch the database from the event loop"""
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.signup = Signup.objects.create(name='Ravi', email='ravi@example.com', password='x')
+        StudentProfile.objects.create(user=cls.signup, education_level='undergraduate')
+        for title in ('National Merit Award', 'State Need Grant'):
+            Scholarship.objects.create(
+                title=title, provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+            )
+
+    def setUp(self):
+        for alias in ('default', 'fragments', 'pages'):
+            caches[alias].clear()
+        # Make the views look for the search index again rather than reuse an earlier answer
+        search._available.clear()
+
+    def get(self, path, data=None, **headers):
+        async def request():
+            return await self.async_client.get(path, data, **headers)
+        return async_to_sync(request)()
+
+    def test_scholarship_search(self):
+        session = self.async_client.session
+        session['user_id'] = self.signup.id
+        session.save()
+        response = self.get('/scholarships/', {'q': 'national'})
+        self.assertContains(response, 'National Merit Award')
+        self.assertNotContains(response, 'State Need Grant')
+
+        response = self.get('/api/scholarships/', {'q': 'national'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_anonymous_home_conditional_get(self):
+        stacks = {
+            'sync': (lambda headers=None: self.client.get('/', headers=headers), 'vidhyasathi_project.urls'),
+            'async': (lambda headers=None: self.get('/', headers=headers), AsyncUrls),
+        }
+        for stack, (get, urlconf) in stacks.items():
+            with self.subTest(stack), override_settings(ROOT_URLCONF=urlconf):
+                caches['pages'].clear()
+                response = get()
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.has_header('ETag'))
+                self.assertIn('public', response['Cache-Control'])
+
+                response = get({'If-None-Match': response['ETag']})
+                self.assertEqual(response.status_code, 304)
+
+
+class SearchRankingTests(TestCase):
+    """The listing orders search results best match first unless another sort is picked"""
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.signup = Signup.objects.create(name='Meera', email='meera@example.com', password='x')
+        # The earliest deadline and the lowest id only mention the word in the description
+        for i, (title, description) in enumerate([
+            ('State Need Grant', 'Open to national level rank holders'),
+            ('National Merit Award', 'Description'),
+            ('Women in Science Grant', 'Description'),
+        ]):
+            Scholarship.objects.create(
+                title=title, provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30 - i),
+                description=description, eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+            )
+
+    def setUp(self):
+        for alias in ('default', 'fragments', 'pages'):
+            caches[alias].clear()
+        search._available.clear()
+        session = self.client.session
+        session['user_id'] = self.signup.id
+        session.save()
+
+    def titles(self, data):
+        response = self.client.get('/scholarships/', data)
+        self.assertEqual(response.status_code, 200)
+        return [scholarship.title for scholarship in response.context['scholarships']]
+
+    def test_search_is_ranked(self):
+        self.assertEqual(self.titles({'q': 'national'}), ['National Merit Award', 'State Need Grant'])
+        self.assertEqual(self.titles({'q': 'national', 'sort': 'relevance'}),
+                         ['National Merit Award', 'State Need Grant'])
+        # An explicit sort still wins
+        self.assertEqual(self.titles({'q': 'national', 'sort': 'deadline_desc'}),
+                         ['State Need Grant', 'National Merit Award'])
+        # Without search words there is nothing to rank by
+        self.assertEqual(self.titles({'sort': 'relevance'})[0], 'State Need Grant')
+
+    @mock.patch.object(views, 'SCHOLARSHIPS_PAGE_SIZE', 1)
+    def test_ranked_pages(self):
+        seen, url = [], '/scholarships/?q=national'
+        while url:
+            response = self.client.get(url)
+            seen += [scholarship.title for scholarship in response.context['scholarships']]
+            url = response.context['next_query'] and '/scholarships/?' + response.context['next_query']
+        self.assertEqual(seen, ['National Merit Award', 'State Need Grant'])
+
+
+class SyncTests(TestCase):
+    """Delta sync: exact pages, an overlap window once caught up, and tombstones"""
+    databases = {'default', 'recommendations'}
+
+    def create_scholarship(self, title):
+        return Scholarship.objects.create(
+            title=title, provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+            description='Description', eligibility='Eligibility', application_process='Apply online',
+            website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+        )
+
+    def sync(self, token=None, limit=200):
+        delta = sync.get_changes(token, limit)
+        return [change['id'] for change in delta['changes']], delta
+
+    def test_pages_then_overlap(self):
+        first, second, third = (self.create_scholarship(f'Award {i}') for i in range(3))
+        ids, delta = self.sync(limit=2)
+        self.assertEqual(ids, [first.id, second.id])
+        self.assertTrue(delta['has_more'])
+        ids, delta = self.sync(delta['next_token'], limit=2)
+        self.assertEqual(ids, [third.id])
+        self.assertFalse(delta['has_more'])
+        caught_up = delta['next_token']
+
+        # A write stamped before the client's newest change but committed after it
+        late = self.create_scholarship('Late Award')
+        Scholarship.objects.filter(pk=late.pk).update(updated_at=third.updated_at - timedelta(seconds=30))
+        # and one outside the window, which the overlap can't cover
+        old = self.create_scholarship('Old Award')
+        Scholarship.objects.filter(pk=old.pk).update(updated_at=third.updated_at - sync.SYNC_OVERLAP * 2)
+
+        ids, delta = self.sync(caught_up)
+        self.assertIn(late.id, ids)
+        self.assertIn(third.id, ids)
+        self.assertNotIn(old.id, ids)
+        # Nothing new: the window is the same, it doesn't slide back with each poll
+        self.assertEqual(self.sync(delta['next_token'])[0], ids)
+
+    def test_tombstones(self):
+        self.create_scholarship('Deleted Before Sync').delete()
+        self.create_scholarship('Kept Award')
+        deleted = self.create_scholarship('Deleted Award')
+        _, delta = self.sync()
+        # An initial sync has nothing to delete
+        self.assertEqual(delta['deleted'], [])
+
+        deleted_id = deleted.id
+        deleted.delete()
+        ids, delta = self.sync(delta['next_token'])
+        self.assertEqual(delta['deleted'], [deleted_id])
+        self.assertNotIn(deleted_id, ids)
+        # Each tombstone is sent once
+        self.assertEqual(self.sync(delta['next_token'])[1]['deleted'], [])
+
+    def test_tombstone_pages(self):
+        _, delta = self.sync()
+        scholarships = [self.create_scholarship(f'Award {i}') for i in range(3)]
+        deleted_ids = [scholarship.id for scholarship in scholarships]
+        for scholarship in scholarships:
+            scholarship.delete()
+
+        seen, token = [], delta['next_token']
+        while True:
+            _, delta = self.sync(token, limit=2)
+            seen += delta['deleted']
+            token = delta['next_token']
+            if not delta['has_more']:
+                break
+        self.assertEqual(seen, deleted_ids)
+
+    def test_invalid_token(self):
+        response = self.client.get('/api/scholarships/sync/', {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, 400)
+
+
+class EligibilityFilterTests(TestCase):
+    """The API's citizenship and field filters over the JSON requirement lists"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for title, citizenship, fields in [
+            ('Open Award', [], []),
+            ('Indian Engineers', ['India'], ['Engineering', 'Technology']),
+            ('Nepal Law Grant', ['Nepal'], ['Law']),
+        ]:
+            Scholarship.objects.create(
+                title=title, provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+                citizenship_requirements=citizenship, field_of_study_requirements=fields,
+            )
+
+    def titles(self, **params):
+        response = self.client.get('/api/scholarships/', {'fields': 'title', **params})
+        self.assertEqual(response.status_code, 200)
+        return {row['title'] for row in response.json()['results']}
+
+    def test_has_item(self):
+        self.assertEqual(
+            set(Scholarship.objects.filter(field_of_study_requirements__has_item='Technology')
+                .values_list('title', flat=True)),
+            {'Indian Engineers'},
+        )
+
+    def test_api_filters(self):
+        self.assertEqual(self.titles(citizenship='India'), {'Open Award', 'Indian Engineers'})
+        self.assertEqual(self.titles(field_of_study='Law'), {'Open Award', 'Nepal Law Grant'})
+        self.assertEqual(self.titles(citizenship='India', field_of_study='Law'), {'Open Award'})
+
+
+# The recommendation table as it was in the main database before 0012, foreign keys included
+LEGACY_RECOMMENDATION_TABLE = '''
+    CREATE TABLE "scholarship_app_scholarshiprecommendation" (
+        "id" integer NOT NULL PRIMARY KEY AUTOINCREMENT,
+        "student_id" bigint NOT NULL REFERENCES "scholarship_app_studentprofile" ("id"),
+        "scholarship_id" bigint NOT NULL REFERENCES "scholarship_app_scholarship" ("id"),
+        "match_score" decimal NOT NULL, "reason" text NOT NULL,
+        "field_of_study" varchar(100) NOT NULL, "created_at" datetime NOT NULL
+    )
+'''
+
+
+class RecommendationsDatabaseMigrationTests(TestCase):
+    """A database migrated from before the recommendations split"""
+    databases = {'default', 'recommendations'}
+
+    def test_legacy_tables_dropped_after_copy(self):
+        migration = import_module('scholarship_app.migrations.0018_drop_main_database_recommendation_tables')
+        signup = Signup.objects.create(name='Meera', email='meera@example.com', password='x')
+        profile = StudentProfile.objects.create(user=signup, education_level='undergraduate')
+        scholarship = Scholarship.objects.create(
+            title='Legacy Grant', provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+            description='Description', eligibility='Eligibility', application_process='Apply online',
+            website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+        )
+        main = connections['default']
+        with main.cursor() as cursor:
+            cursor.execute(LEGACY_RECOMMENDATION_TABLE)
+            cursor.execute(
+                'INSERT INTO scholarship_app_scholarshiprecommendation '
+                "(student_id, scholarship_id, match_score, reason, field_of_study, created_at) "
+                "VALUES (%s, %s, 80, 'Match', '', '2026-01-01 00:00:00')",
+                [profile.pk, scholarship.pk],
+            )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Scholarship.objects.filter(pk=scholarship.pk).delete()
+
+        migration.detach_main_database_tables(django_apps, SimpleNamespace(connection=main))
+
+        self.assertNotIn('scholarship_app_scholarshiprecommendation', main.introspection.table_names())
+        self.assertTrue(ScholarshipRecommendation.objects.filter(student=profile, scholarship=scholarship).exists())
+        scholarship.delete()
+        profile.delete()
+        self.assertFalse(Scholarship.objects.filter(pk=scholarship.pk).exists())
+
+
+class RateLimitTests(TestCase):
+    """Per-client token buckets and shedding when every scoring slot is busy"""
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.signup = Signup.objects.create(name='Kiran', email='kiran@example.com', password='x')
+        cls.profile = StudentProfile.objects.create(user=cls.signup, education_level='undergraduate')
+
+    def setUp(self):
+        caches[settings.RATE_LIMIT_CACHE].clear()
+        session = self.client.session
+        session['user_id'] = self.signup.id
+        session.save()
+
+    @contextmanager
+    def scoring_busy(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch.object(ratelimit, '_scoring_slots', slots):
+            yield
+
+    def test_refresh_limited_per_student(self):
+        burst = settings.RATE_LIMITS['refresh_recommendations']['burst']
+        for _ in range(burst):
+            self.assertEqual(self.client.get('/refresh-recommendations/').status_code, 302)
+        response = self.client.get('/refresh-recommendations/')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) >= 1)
+
+    def test_scoring_overloaded_queues_refresh(self):
+        with self.scoring_busy():
+            response = self.client.post('/profile/', {
+                'gender': 'female', 'nationality': 'Indian', 'citizenship': 'Indian',
+                'education_level': 'postgraduate', 'field_of_study': 'Physics',
+            })
+        self.assertEqual(response.status_code, 302)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.field_of_study, 'Physics')
+        job = RecomputeJob.objects.get()
+        self.assertEqual((job.kind, job.target_ids, job.status), (RecomputeJob.STUDENTS, [self.profile.pk], RecomputeJob.PENDING))
+
+        with self.scoring_busy():
+            self.assertEqual(self.client.get('/refresh-recommendations/').status_code, 302)
+        self.assertEqual(RecomputeJob.objects.count(), 2)
+
+
+class RecomputeJobTests(TestCase):
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.profiles = []
+        for name in ('Anu', 'Bala'):
+            signup = Signup.objects.create(name=name, email=f'{name.lower()}@example.com', password='x')
+            cls.profiles.append(StudentProfile.objects.create(
+                user=signup, education_level='undergraduate', cgpa=Decimal('8.50'),
+            ))
+        cls.scholarships = [
+            Scholarship.objects.create(
+                title=f'Award {i}', provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+                min_cgpa=Decimal('7.00'),
+            )
+            for i in range(3)
+        ]
+
+    def test_scholarships_job_progress(self):
+        job = recompute.enqueue_recompute(RecomputeJob.SCHOLARSHIPS, [self.scholarships[0].pk])
+        self.assertEqual(recompute.run_pending_jobs(batch_size=1), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.total, job.pairs_scored), (RecomputeJob.DONE, 2, 2, 2))
+        self.assertEqual(job.percent_done, 100)
+        self.assertEqual(
+            set(ScholarshipRecommendation.objects.values_list('student_id', 'scholarship_id')),
+            {(profile.pk, self.scholarships[0].pk) for profile in self.profiles},
+        )
+
+    def test_students_job_leaves_leased_student(self):
+        busy, free = self.profiles
+        self.assertTrue(claim_refresh(busy.pk))
+        job = recompute.enqueue_recompute(RecomputeJob.STUDENTS, [busy.pk, free.pk])
+        recompute.run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.pairs_scored), (RecomputeJob.DONE, 2, 3))
+        self.assertFalse(ScholarshipRecommendation.objects.filter(student=busy).exists())
+        self.assertEqual(ScholarshipRecommendation.objects.filter(student=free).count(), 3)
+
+    def test_stale_running_job_requeued(self):
+        recompute.enqueue_recompute(RecomputeJob.SCHOLARSHIPS, [self.scholarships[0].pk])
+        lost = recompute.claim_next_job()
+        self.assertIsNone(recompute.claim_next_job())
+
+        stale = timezone.now() - timedelta(seconds=settings.RECOMPUTE_STALE_SECONDS + 1)
+        RecomputeJob.objects.filter(pk=lost.pk).update(heartbeat_at=stale, processed=1)
+        job = recompute.claim_next_job()
+        self.assertEqual((job.pk, job.status, job.processed), (lost.pk, RecomputeJob.RUNNING, 0))
+
+        # The first worker wakes up: it stops at its next batch without finishing the job
+        with self.assertLogs('scholarship_app.recompute', 'WARNING'):
+            recompute.run_job(lost)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (RecomputeJob.RUNNING, 0))
+
+        recompute.run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (RecomputeJob.DONE, 2))
+
+
+IMPORT_HEADER = 'title,provider,amount,deadline,description,eligibility,application_process,website,scholarship_type,education_level,citizenship_requirements\n'
+
+
+class ImportScholarshipsTests(TestCase):
+    def run_import(self, rows):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'feed.csv')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(IMPORT_HEADER + ''.join(rows))
+            stdout, stderr = StringIO(), StringIO()
+            call_command('import_scholarships', path, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_validate_upsert_and_skip_unchanged(self):
+        rows = [
+            'Merit Award,Trust,"₹ 1,25,000",31/12/2030,D,E,A,https://example.com,Merit,undergraduate,India; Nepal\n',
+            'Need Grant,Trust,5000,2030-06-30,D,E,A,https://example.com,need,Graduate,\n',
+            'Broken,Trust,5000,not a date,D,E,A,https://example.com,lottery,undergraduate,\n',
+        ]
+        stdout, stderr = self.run_import(rows)
+        self.assertIn('2 created, 0 updated, 0 unchanged, 1 invalid', stdout)
+        self.assertIn('Line 4: ', stderr)
+        self.assertIn('deadline', stderr)
+        self.assertIn('scholarship_type', stderr)
+        award = Scholarship.objects.get(title='Merit Award')
+        self.assertEqual((award.amount, award.deadline, award.scholarship_type, award.citizenship_requirements),
+                         (Decimal('125000'), date(2030, 12, 31), 'merit', ['India', 'Nepal']))
+
+        stdout, _ = self.run_import(rows[:2])
+        self.assertIn('0 created, 0 updated, 2 unchanged', stdout)
+        self.assertEqual(Scholarship.objects.get(pk=award.pk).updated_at, award.updated_at)
+
+        stdout, _ = self.run_import([rows[0].replace('"₹ 1,25,000"', '150000'), rows[1]])
+        self.assertIn('0 created, 1 updated, 1 unchanged', stdout)
+        self.assertEqual(Scholarship.objects.get(pk=award.pk).amount, Decimal('150000'))
+        self.assertEqual(Scholarship.objects.count(), 2)
+
+
+class ExportRecommendationsTests(TestCase):
+    databases = {'default', 'recommendations'}
+
+    def test_snapshot_export(self):
+        signup = Signup.objects.create(name='Dev', email='dev@example.com', password='x')
+        profile = StudentProfile.objects.create(user=signup, education_level='undergraduate',
+                                                field_of_study='History')
+        for i in range(3):
+            scholarship = Scholarship.objects.create(
+                title=f'Export {i}', provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+            )
+            ScholarshipRecommendation.objects.create(student=profile, scholarship=scholarship, match_score=40 + i,
+                                                     reason='Match')
+        stderr = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'recommendations.jsonl')
+            call_command('export_recommendations', '--format', 'jsonl', '--chunk-size', '2', '--output', path,
+                         stderr=stderr)
+            with open(path, encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual([row['scholarship_title'] for row in rows], ['Export 0', 'Export 1', 'Export 2'])
+        self.assertEqual({row['student_field_of_study'] for row in rows}, {'History'})
+        self.assertEqual(set(rows[0]), set(exports.EXPORT_COLUMNS))
+        self.assertIn('Exported 3 recommendations', stderr.getvalue())
+
+
+class RefreshSkippingTests(TestCase):
+    """A refresh rescores only when the stamp of scoring inputs, catalog and open set moves"""
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        signup = Signup.objects.create(name='Ila', email='ila@example.com', password='x')
+        cls.profile = StudentProfile.objects.create(user=signup, education_level='undergraduate', cgpa=Decimal('8.50'))
+        for title, days in (('Closing Today', 0), ('Closing Later', 30)):
+            Scholarship.objects.create(
+                title=title, provider='Provider', amount=5000, deadline=date.today() + timedelta(days=days),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+                min_cgpa=Decimal('7.00'),
+            )
+
+    def refresh(self):
+        with mock.patch.object(utils, 'rescore_student', wraps=utils.rescore_student) as rescore:
+            count = utils.refresh_recommendations_for_student(self.profile)
+        return count, rescore.call_count
+
+    def test_unchanged_inputs_skip_rescoring(self):
+        self.assertEqual(self.refresh(), (2, 1))
+        self.assertEqual(self.refresh(), (2, 0))
+
+        # Same values in another type or scale
+        self.profile.cgpa = 8.5
+        self.assertEqual(self.refresh(), (2, 0))
+        self.profile.cgpa = 9
+        self.assertEqual(self.refresh(), (2, 1))
+
+    def test_expired_scholarship_rescored_away(self):
+        self.assertEqual(self.refresh(), (2, 1))
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(days=1)):
+            self.assertEqual(self.refresh(), (1, 1))
+        self.assertEqual(
+            list(ScholarshipRecommendation.objects.values_list('scholarship_id', flat=True)),
+            [Scholarship.objects.get(title='Closing Later').pk],
+        )
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, fn, callers=4):
+        """Call fn through one SingleFlight from several threads; fn runs once every caller is in do()"""
+        flight, arrived = SingleFlight(), threading.Semaphore(0)
+        results, errors = [], []
+
+        def leader_fn():
+            for _ in range(callers):
+                arrived.acquire(timeout=5)
+            # The last caller signalled just before calling do()
+            time.sleep(0.05)
+            return fn()
+
+        def call():
+            arrived.release()
+            try:
+                results.append(flight.do('key', leader_fn))
+            except ValueError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return flight, results, errors
+
+    def test_concurrent_calls_share_one_run(self):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            return 'scored'
+
+        flight, results, _ = self.run_concurrently(fn)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [('scored', False)] + [('scored', True)] * 3)
+        # The key is free again once the run is over
+        self.assertEqual(flight.do('key', lambda: 'again'), ('again', False))
+
+    def test_error_shared_with_waiters(self):
+        def fn():
+            raise ValueError('scoring failed')
+
+        _, results, errors = self.run_concurrently(fn, callers=3)
+        self.assertEqual((results, len(errors)), ([], 3))
+
+
+class CompiledCatalogTests(TestCase):
+    """Scoring from the compiled catalog file must match scoring from the database"""
+    databases = {'default', 'recommendations'}
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, (level, kind, min_cgpa, incomes, fields, minorities) in enumerate([
+            ('undergraduate', 'merit', Decimal('7.50'), (None, None), [], []),
+            ('any', 'need', None, (Decimal('0'), Decimal('250000.50')), ['Engineering', 'Physics'], []),
+            ('graduate', 'minority', Decimal('9.25'), (Decimal('100000'), None), ['Law'], ['Women in STEM']),
+            ('undergraduate', 'disability', Decimal('6.00'), (None, Decimal('800000')), [], ['SC', 'ST']),
+        ]):
+            Scholarship.objects.create(
+                title=f'Compiled {i}', provider='Provider', amount=5000, deadline=date.today() + timedelta(days=i),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type=kind, education_level=level, min_cgpa=min_cgpa,
+                income_min=incomes[0], income_max=incomes[1], field_of_study_requirements=fields,
+                minority_preferences=minorities, disability_preferences=['visual'] if kind == 'disability' else [],
+            )
+        Scholarship.objects.create(
+            title='Closed', provider='Provider', amount=5000, deadline=date.today() - timedelta(days=1),
+            description='Description', eligibility='Eligibility', application_process='Apply online',
+            website='https://example.com', scholarship_type='merit', education_level='any',
+        )
+        cls.profiles = []
+        for i, (level, cgpa, income, field, aid, minorities, disabilities) in enumerate([
+            ('undergraduate', Decimal('8.00'), Decimal('200000'), 'Mechanical Engineering', True, ['SC'], []),
+            ('graduate', Decimal('7.60'), None, 'Law', False, ['Women in STEM'], ['visual']),
+            ('high_school', None, Decimal('900000'), '', True, [], []),
+        ]):
+            signup = Signup.objects.create(name=f'Student {i}', email=f'student{i}@example.com', password='x')
+            cls.profiles.append(StudentProfile.objects.create(
+                user=signup, education_level=level, cgpa=cgpa, family_income=income, field_of_study=field,
+                financial_aid_needed=aid, minority_groups=minorities, disabilities=disabilities,
+            ))
+
+    def test_compiled_scoring_matches_database(self):
+        version = format_catalog_version(catalog_version())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'catalog.bin')
+            call_command('compile_catalog', '--output', path, stdout=StringIO())
+            catalog = load_catalog(path)
+            self.assertEqual(catalog.version, version)
+
+            entries = {entry.id: entry for entry in catalog.active(date.today())}
+            scholarships = Scholarship.objects.in_bulk(entries)
+            self.assertEqual(set(entries), set(Scholarship.objects.filter(deadline__gte=date.today())
+                                               .values_list('id', flat=True)))
+            for profile in self.profiles:
+                for pk, entry in entries.items():
+                    with self.subTest(profile=profile.pk, scholarship=pk):
+                        self.assertEqual(utils.calculate_match_score(profile, entry),
+                                         utils.calculate_match_score(profile, scholarships[pk]))
+                        self.assertEqual(utils.generate_recommendation_reason(profile, entry, 50),
+                                         utils.generate_recommendation_reason(profile, scholarships[pk], 50))
+
+            def scored(catalog_path):
+                with override_settings(SCORING_CATALOG_PATH=catalog_path):
+                    for profile in self.profiles:
+                        utils.rescore_student(profile, version)
+                return set(ScholarshipRecommendation.objects.values_list(
+                    'student_id', 'scholarship_id', 'match_score', 'reason'))
+
+            from_file = scored(path)
+            self.assertGreater(len(from_file), len(self.profiles))
+            self.assertEqual(from_file, scored(''))
+
+
+def stats_snapshot():
+    """
+    The counters as comparable sets. A stats row whose recommendations are
+    all gone is left at zero rather than deleted, which is the same as no row.
+    """
+    stats = set(ScholarshipStats.objects.exclude(recommendation_count=0).values_list(
+        'scholarship_id', 'recommendation_count', 'score_total',
+        *(column for _, column in ScholarshipStats.SCORE_BUCKETS),
+    ))
+    fields = set(ScholarshipFieldCount.objects.values_list('scholarship_id', 'field_of_study', 'recommendation_count'))
+    return stats, fields
+
+
+def assert_stats_match_rebuild(test):
+    incremental = stats_snapshot()
+    rebuild_scholarship_stats()
+    test.assertEqual(incremental, stats_snapshot())
+
+
+class RetentionTests(TestCase):
+    databases = {'default', 'recommendations'}
+
+    def test_apply_retention_in_batches(self):
+        today = date.today()
+        scholarships = [
+            Scholarship.objects.create(
+                title=f'Retained {i}', provider='Provider', amount=5000,
+                deadline=today - timedelta(days=settings.SCHOLARSHIP_ARCHIVE_GRACE_DAYS + 1 + i) if i < 5
+                else today + timedelta(days=i),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+            )
+            for i in range(7)
+        ]
+        expired, open_ = scholarships[:5], scholarships[5:]
+        signup = Signup.objects.create(name='Gita', email='gita@example.com', password='x')
+        profile = StudentProfile.objects.create(user=signup, education_level='undergraduate')
+        missing_student_id = profile.pk + 100
+        add_recommendations([
+            ScholarshipRecommendation(student_id=student_id, scholarship_id=scholarship.pk,
+                                      match_score=30 + 10 * i, reason='Match', field_of_study='Art')
+            for student_id in (profile.pk, missing_student_id)
+            for i, scholarship in enumerate(scholarships)
+        ])
+
+        purge = mock.Mock(wraps=purge_scholarship_recommendations)
+        with mock.patch('scholarship_app.retention.purge_scholarship_recommendations', purge):
+            call_command('apply_retention', '--batch-size', '2', '--pause', '0', stdout=StringIO())
+
+        self.assertEqual(set(ArchivedScholarship.objects.values_list('scholarship_id', flat=True)),
+                         {scholarship.pk for scholarship in expired})
+        self.assertEqual(set(Scholarship.objects.values_list('id', flat=True)), {s.pk for s in open_})
+        self.assertEqual(ScholarshipDeletion.objects.count(), len(expired))
+        self.assertEqual(
+            set(ScholarshipRecommendation.objects.values_list('student_id', 'scholarship_id')),
+            {(profile.pk, scholarship.pk) for scholarship in open_},
+        )
+        # Every purge removed at most one batch
+        self.assertGreater(purge.call_count, len(expired))
+        self.assertTrue(all(call.args[1] == 2 for call in purge.call_args_list))
+        assert_stats_match_rebuild(self)
+
+
+class ScholarshipStatsTests(TestCase):
+    """Every recommendation write path keeps the counters equal to a full rebuild"""
+    databases = {'default', 'recommendations'}
+
+    def recommend(self, profile, scholarship, score, field='Physics'):
+        return ScholarshipRecommendation(student=profile, scholarship_id=scholarship.pk, match_score=score,
+                                         reason='Match', field_of_study=field)
+
+    def test_incremental_counters_match_rebuild(self):
+        scholarships = [
+            Scholarship.objects.create(
+                title=f'Counted {i}', provider='Provider', amount=5000, deadline=date.today() + timedelta(days=30),
+                description='Description', eligibility='Eligibility', application_process='Apply online',
+                website='https://example.com', scholarship_type='merit', education_level='undergraduate',
+            )
+            for i in range(3)
+        ]
+        profiles = []
+        for name in ('Hari', 'Jaya'):
+            signup = Signup.objects.create(name=name, email=f'{name.lower()}@example.com', password='x')
+            profiles.append(StudentProfile.objects.create(user=signup, education_level='undergraduate'))
+        first, second = profiles
+
+        add_recommendations([self.recommend(first, scholarship, 25 + 20 * i)
+                             for i, scholarship in enumerate(scholarships)])
+        assert_stats_match_rebuild(self)
+
+        # A refresh that moves scores across buckets and drops a pair
+        replace_student_recommendations(first, [self.recommend(first, scholarships[0], Decimal('81.50')),
+                                                self.recommend(first, scholarships[1], 45, field='Law')])
+        replace_student_recommendations(second, [self.recommend(second, scholarship, 60, field='')
+                                                 for scholarship in scholarships])
+        assert_stats_match_rebuild(self)
+
+        # A scholarships recompute job rewriting one column of pairs
+        replace_pair_recommendations([first.pk, second.pk], [scholarships[2].pk],
+                                     [self.recommend(first, scholarships[2], 99)])
+        assert_stats_match_rebuild(self)
+
+        # Deleting a scholarship drops its counters; its rows go with retention
+        deleted_id = scholarships[0].pk
+        scholarships[0].delete()
+        purge_scholarship_recommendations([deleted_id], 10)
+        assert_stats_match_rebuild(self)
+
+        delete_student_recommendations([second.pk])
+        assert_stats_match_rebuild(self)
+        self.assertEqual(stats_snapshot()[0], {
+            (scholarships[1].pk, 1, Decimal('45'), 0, 0, 1, 0, 0),
+            (scholarships[2].pk, 1, Decimal('99'), 0, 0, 0, 0, 1),
+        })
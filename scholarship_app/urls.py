@@ -1,19 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Read-heavy views have async twins for ASGI deployments
+read_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('scholarships/', views.scholarships, name='scholarships'),
+    path('', read_views.home, name='home'),
+    path('scholarships/', read_views.scholarships, name='scholarships'),
     path('forgot-password/', views.forgot_password, name='forgot_password'),
     path('forum/', views.forum, name='forum'),
+    path('forum/<int:topic_id>/', views.forum_topic, name='forum_topic'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     path('login/', views.login_view, name='login'),
     path('register/', views.register, name='register'),
     path('logout/', views.logout_view, name='logout'),
     path('profile/', views.profile, name='profile'),
-    path('recommendations/', views.recommendations, name='recommendations'),
+    path('recommendations/', read_views.recommendations, name='recommendations'),
     path('refresh-recommendations/', views.refresh_recommendations, name='refresh_recommendations'),
-    path('api/scholarships/', views.api_scholarships, name='api_scholarships'),
+    path('api/scholarships/', read_views.api_scholarships, name='api_scholarships'),
+    path('api/scholarships/search/', views.api_scholarships_search, name='api_scholarships_search'),
+    path('api/scholarships/sync/', views.api_scholarships_sync, name='api_scholarships_sync'),
+    path('api/recommendations/export/', views.api_recommendations_export, name='api_recommendations_export'),
 
 ]
\ No newline at end of file
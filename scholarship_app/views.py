@@ -1,32 +1,50 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login as auth_login, authenticate, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import JsonResponse
-from .models import Scholarship, ForumTopic, ForumReply, StudentProfile, ScholarshipRecommendation, Signup
-from .forms import SignupForm, LoginForm
-from .recommendation_engine.utils import get_recommendations_for_user, refresh_recommendations_for_student, ensure_recommendations_exist
+from django.http import JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils import timezone
+from django.views.decorators.http import condition
+from django.db.models import Count, Max
+from .models import Scholarship, ForumTopic, ForumReply, StudentProfile, ScholarshipRecommendation, Signup, RecomputeJob
+from .forms import SignupForm, LoginForm, ScholarshipFilterForm, ScholarshipApiForm, ScholarshipSyncForm, ScholarshipSearchForm, RecommendationExportForm
+from .catalog import catalog_version
+from .http_cache import public_page
+from .sync import get_changes, InvalidSyncToken, ExpiredSyncToken
+from .search import search_scholarships
+from .exports import CONTENT_TYPES, encode_jsonl, encode_rows, export_recommendations
+from .pagination import keyset_paginate, InvalidCursor
+from .ratelimit import ScoringOverloaded
+from .recompute import enqueue_recompute
+from .recommendation_engine.utils import get_recommendations_for_profile, refresh_recommendations_for_student, ensure_recommendations_exist
 from decimal import Decimal
-import json
+import hashlib
+
+SCHOLARSHIPS_PAGE_SIZE = 24
+API_PAGE_SIZE = 50
+API_STREAM_CHUNK_SIZE = 500
+API_MAX_AGE = 60
+API_SYNC_PAGE_SIZE = 200
+API_SEARCH_LIMIT = 10
+FORUM_PAGE_SIZE = 20
 
 
 def frontend_login_required(view_func):
     def wrapper(request, *args, **kwargs):
-        if 'user_id' not in request.session:
+        if not request.student:
             messages.error(request, "Please login to access this page.")
             return redirect('login')
         return view_func(request, *args, **kwargs)
     return wrapper
 
 
+@public_page()
 def home(request):
-    if 'user_id' in request.session:
-        try:
-            user = Signup.objects.get(id=request.session['user_id'])
-            profile = StudentProfile.objects.get(user=user)
-            recommendations = get_recommendations_for_user(user, 3)
-        except (StudentProfile.DoesNotExist, Signup.DoesNotExist):
-            recommendations = []
+    profile = request.student.profile
+    if profile:
+        recommendations = get_recommendations_for_profile(profile, 3)
     else:
         recommendations = []
     
@@ -35,33 +53,75 @@ def home(request):
     }
     return render(request, 'home.html', context)
 
-@frontend_login_required
-def scholarships(request):
-    all_scholarships = Scholarship.objects.all().order_by('-deadline')
-    
-    # Get recommendations for the user
-    user = Signup.objects.get(id=request.session['user_id'])
-    try:
-        profile = StudentProfile.objects.get(user=user)
-        recommendations = get_recommendations_for_user(user)
-        recommended_ids = [rec.scholarship.id for rec in recommendations]
-    except StudentProfile.DoesNotExist:
-        recommendations = []
-        recommended_ids = []
-    
+def is_fragment_request(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest' or 'partial' in request.GET
+
+def get_scholarship_filter_form(request):
+    """
+    Bound and validated listing filters. Invalid filters fall back to the
+    unfiltered listing for full pages; fragments get None (a 400).
+    """
+    form = ScholarshipFilterForm(request.GET)
+    if not form.is_valid():
+        if is_fragment_request(request):
+            return None
+        form = ScholarshipFilterForm({})
+        form.is_valid()
+    return form
+
+def render_scholarship_listing(request, form, page, recommended_ids):
+    next_query = None
+    if page.has_next:
+        params = request.GET.copy()
+        params.pop('partial', None)
+        params['cursor'] = page.next_cursor
+        next_query = params.urlencode()
+
     context = {
-        'scholarships': all_scholarships,
+        'form': form,
+        'scholarships': page.object_list,
         'recommended_ids': recommended_ids,
+        'next_query': next_query,
     }
+    if is_fragment_request(request):
+        return render(request, 'partials/scholarship_results.html', context)
     return render(request, 'scholarships.html', context)
 
 @frontend_login_required
-def profile(request):
-    user = Signup.objects.get(id=request.session['user_id'])
+def scholarships(request):
+    profile = request.student.profile
+
+    form = get_scholarship_filter_form(request)
+    if form is None:
+        return HttpResponseBadRequest('Invalid filters')
+
+    # Recommendations are in another database, so the recommended-only
+    # filter gets the student's ids as a list
+    recommended_ids = None
+    if profile and form.cleaned_data.get('recommended'):
+        recommended_ids = list(ScholarshipRecommendation.objects.filter(student=profile)
+                               .values_list('scholarship_id', flat=True))
+
+    queryset = form.filter_queryset(Scholarship.objects.all(), recommended_ids)
     try:
-        profile = StudentProfile.objects.get(user=user)
-    except StudentProfile.DoesNotExist:
-        profile = None
+        page = keyset_paginate(queryset, form.get_ordering(), form.cleaned_data.get('cursor'), SCHOLARSHIPS_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+
+    # Only look up the recommended badge for the scholarships on this page
+    page_recommended_ids = set()
+    if profile and page.object_list:
+        page_recommended_ids = set(ScholarshipRecommendation.objects.filter(
+            student=profile,
+            scholarship_id__in=[s.id for s in page.object_list],
+        ).values_list('scholarship_id', flat=True))
+
+    return render_scholarship_listing(request, form, page, page_recommended_ids)
+
+@frontend_login_required
+def profile(request):
+    user = request.student.signup
+    profile = request.student.profile
     
     # Define choices for checkbox groups
     extracurricular_choices = [
@@ -147,23 +207,27 @@ def profile(request):
             
         profile.financial_aid_needed = 'financial_aid_needed' in request.POST
         
-        # Update additional criteria (stored as JSON)
-        extracurriculars = request.POST.getlist('extracurriculars')
-        profile.extracurriculars = json.dumps(extracurriculars) if extracurriculars else '[]'
+        # Update additional criteria (stored as JSON lists)
+        profile.extracurriculars = request.POST.getlist('extracurriculars')
         
-        achievements = request.POST.getlist('achievements')
-        profile.achievements = json.dumps(achievements) if achievements else '[]'
+        profile.achievements = request.POST.getlist('achievements')
         
-        disabilities = request.POST.getlist('disabilities')
-        profile.disabilities = json.dumps(disabilities) if disabilities else '[]'
+        profile.disabilities = request.POST.getlist('disabilities')
         
-        minority_groups = request.POST.getlist('minority_groups')
-        profile.minority_groups = json.dumps(minority_groups) if minority_groups else '[]'
+        profile.minority_groups = request.POST.getlist('minority_groups')
         
         profile.save()
+        # A first save creates the profile this request resolved as None
+        request.student.clear()
         
-        # Refresh recommendations
-        count = refresh_recommendations_for_student(profile)
+        # Refresh recommendations; the profile is saved either way, so when
+        # every scoring slot is busy the student is queued instead
+        try:
+            count = refresh_recommendations_for_student(profile)
+        except ScoringOverloaded:
+            queue_student_refresh(profile)
+            messages.success(request, 'Profile updated successfully! Your recommendations will update shortly.')
+            return redirect('profile')
         
         # Ensure at least some recommendations exist
         final_count = ensure_recommendations_exist(profile)
@@ -181,19 +245,22 @@ def profile(request):
     }
     return render(request, 'profile.html', context)
 
+def queue_student_refresh(profile):
+    """Rescore a student in a recompute job, for when scoring is too busy to do it in the request"""
+    enqueue_recompute(RecomputeJob.STUDENTS, [profile.pk], requested_by=profile.user.email)
+
 @frontend_login_required
 def recommendations(request):
-    user = Signup.objects.get(id=request.session['user_id'])
-    try:
-        profile = StudentProfile.objects.get(user=user)
-        recommendations = get_recommendations_for_user(user)
+    profile = request.student.profile
+    if profile:
+        recommendations = get_recommendations_for_profile(profile)
         
         # If no recommendations, try to create some
         if not recommendations:
             ensure_recommendations_exist(profile)
-            recommendations = get_recommendations_for_user(user)
+            recommendations = get_recommendations_for_profile(profile)
             
-    except StudentProfile.DoesNotExist:
+    else:
         recommendations = []
         messages.error(request, 'Please complete your profile first to get recommendations.')
     
@@ -204,23 +271,53 @@ def recommendations(request):
 
 @frontend_login_required
 def refresh_recommendations(request):
-    try:
-        user = Signup.objects.get(id=request.session['user_id'])
-        profile = StudentProfile.objects.get(user=user)
-        count = refresh_recommendations_for_student(profile)
-        messages.success(request, f'Recommendations refreshed! Found {count} matching scholarships.')
-    except StudentProfile.DoesNotExist:
+    profile = request.student.profile
+    if profile:
+        try:
+            count = refresh_recommendations_for_student(profile)
+        except ScoringOverloaded:
+            queue_student_refresh(profile)
+            messages.info(request, 'We are busy right now; your recommendations will update shortly.')
+        else:
+            messages.success(request, f'Recommendations refreshed! Found {count} matching scholarships.')
+    else:
         messages.error(request, 'Please complete your profile first to get recommendations.')
     
     return redirect('recommendations')
 
+def forum_version():
+    stats = ForumTopic.objects.aggregate(
+        last_activity=Max('last_activity_at'), last_edit=Max('updated_at'), count=Count('id'),
+    )
+    return f"{stats['last_activity']}:{stats['last_edit']}:{stats['count']}"
+
+@public_page(version=forum_version)
 def forum(request):
-    topics = ForumTopic.objects.all().order_by('-created_at')
-    return render(request, 'forum.html', {'topics': topics})
+    topics = ForumTopic.objects.select_related('user')
+    try:
+        page = keyset_paginate(topics, ('-last_activity_at', '-id'), request.GET.get('cursor'), FORUM_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render(request, 'forum.html', {'topics': page.object_list, 'next_cursor': page.next_cursor})
 
+def forum_topic(request, topic_id):
+    topic = get_object_or_404(ForumTopic.objects.select_related('user'), pk=topic_id)
+    replies = ForumReply.objects.filter(topic=topic).select_related('user')
+    try:
+        page = keyset_paginate(replies, ('created_at', 'id'), request.GET.get('cursor'), FORUM_PAGE_SIZE)
+    except InvalidCursor:
+        return HttpResponseBadRequest('Invalid cursor')
+    return render(request, 'forum_topic.html', {
+        'topic': topic,
+        'replies': page.object_list,
+        'next_cursor': page.next_cursor,
+    })
+
+@public_page()
 def about(request):
     return render(request, 'about.html')
 
+@public_page()
 def contact(request):
     return render(request, 'contact.html')
 
@@ -310,6 +407,101 @@ def forgot_password(request):
     
     return render(request, 'forgot-password.html')
 
+def api_scholarships_etag(version, request):
+    last_modified, count = version
+    stamp = f"{last_modified.isoformat() if last_modified else ''}:{count}:{request.GET.urlencode()}"
+    return hashlib.sha1(stamp.encode()).hexdigest()
+
+def _request_catalog_version(request):
+    # condition() asks for the ETag and Last-Modified separately; one query serves both
+    if not hasattr(request, '_catalog_version'):
+        request._catalog_version = catalog_version()
+    return request._catalog_version
+
+def _api_scholarships_etag(request):
+    return api_scholarships_etag(_request_catalog_version(request), request)
+
+def _api_scholarships_last_modified(request):
+    return _request_catalog_version(request)[0]
+
+def api_next_url(request, page):
+    if not page.has_next:
+        return None
+    params = request.GET.copy()
+    params['cursor'] = page.next_cursor
+    return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+@condition(etag_func=_api_scholarships_etag, last_modified_func=_api_scholarships_last_modified)
 def api_scholarships(request):
-    scholarships = Scholarship.objects.all().values('title', 'provider', 'amount', 'deadline', 'description')
-    return JsonResponse(list(scholarships), safe=False)
\ No newline at end of file
+    form = ScholarshipApiForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    fields = form.cleaned_data['fields']
+    queryset = form.filter_queryset(Scholarship.objects.all()).values(*fields)
+
+    # Full exports are streamed row by row so memory stays flat
+    if form.cleaned_data.get('format') == 'jsonl':
+        rows = queryset.order_by('id').iterator(chunk_size=API_STREAM_CHUNK_SIZE)
+        response = StreamingHttpResponse(encode_jsonl(rows), content_type='application/x-ndjson')
+    else:
+        try:
+            page = keyset_paginate(queryset, ('id',), form.cleaned_data.get('cursor'),
+                                   form.cleaned_data.get('limit') or API_PAGE_SIZE)
+        except InvalidCursor:
+            return JsonResponse({'errors': {'cursor': ['Invalid cursor']}}, status=400)
+
+        response = JsonResponse({'results': page.object_list, 'next': api_next_url(request, page)})
+
+    patch_cache_control(response, public=True, max_age=API_MAX_AGE)
+    return response
+
+
+def api_scholarships_sync(request):
+    form = ScholarshipSyncForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    try:
+        delta = get_changes(form.cleaned_data.get('since'), form.cleaned_data.get('limit') or API_SYNC_PAGE_SIZE)
+    except ExpiredSyncToken as exc:
+        return JsonResponse({'errors': {'since': [str(exc)]}}, status=410)
+    except InvalidSyncToken as exc:
+        return JsonResponse({'errors': {'since': [str(exc)]}}, status=400)
+
+    response = JsonResponse(delta)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def api_scholarships_search(request):
+    form = ScholarshipSearchForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    hits = search_scholarships(form.cleaned_data['q'], form.cleaned_data.get('limit') or API_SEARCH_LIMIT)
+    scholarships = Scholarship.objects.in_bulk([hit.id for hit in hits])
+    results = [
+        {
+            'id': hit.id,
+            'title': scholarships[hit.id].title,
+            'provider': scholarships[hit.id].provider,
+            'deadline': scholarships[hit.id].deadline,
+            'snippet': hit.snippet,
+        }
+        for hit in hits if hit.id in scholarships
+    ]
+    return JsonResponse({'results': results})
+
+
+@staff_member_required
+def api_recommendations_export(request):
+    form = RecommendationExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    fmt = form.cleaned_data.get('format') or 'csv'
+    response = StreamingHttpResponse(encode_rows(export_recommendations(), fmt), content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="recommendations-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
@@ -169,44 +169,4 @@ function debounce(func, wait, immediate) {
     };
 }
 
-// Scholarship Search and Filter
-function initScholarshipFilters() {
-    const searchInput = document.querySelector('.search-box input');
-    const categoryFilter = document.querySelector('.filters select:first-child');
-    const levelFilter = document.querySelector('.filters select:last-child');
-    const scholarshipCards = document.querySelectorAll('.scholarship-card');
-    
-    if (!searchInput || !categoryFilter || !levelFilter) return;
-    
-    const filterScholarships = debounce(function() {
-        const searchTerm = searchInput.value.toLowerCase();
-        const categoryValue = categoryFilter.value;
-        const levelValue = levelFilter.value;
-        
-        scholarshipCards.forEach(card => {
-            const title = card.querySelector('h3').textContent.toLowerCase();
-            const description = card.querySelector('.description').textContent.toLowerCase();
-            const tags = Array.from(card.querySelectorAll('.tag')).map(tag => tag.textContent);
-            
-            const matchesSearch = title.includes(searchTerm) || description.includes(searchTerm);
-            const matchesCategory = categoryValue === 'All Categories' || tags.includes(categoryValue);
-            const matchesLevel = levelValue === 'All Education Levels' || tags.includes(levelValue);
-            
-            if (matchesSearch && matchesCategory && matchesLevel) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        });
-    }, 300);
-    
-    searchInput.addEventListener('input', filterScholarships);
-    categoryFilter.addEventListener('change', filterScholarships);
-    levelFilter.addEventListener('change', filterScholarships);
-}
-
-// Initialize when scholarships page loads
-if (document.querySelector('.scholarships-grid')) {
-    document.addEventListener('DOMContentLoaded', initScholarshipFilters);
-}
 
@@ -261,54 +261,59 @@ function showNotification(message, type = 'info') {
 }
 
 // Scholarship filter system
+// Filtering, sorting and pagination happen on the server; this only swaps
+// in the rendered result fragments so the page doesn't reload.
 function initFilterSystem() {
-    const searchInput = document.getElementById('search-input');
-    const searchButton = document.getElementById('search-button');
-    const categoryFilter = document.getElementById('category-filter');
-    const educationFilter = document.getElementById('education-filter');
-    const scholarshipCards = document.querySelectorAll('.scholarship-card');
+    const filterForm = document.getElementById('scholarship-filters');
+    const results = document.getElementById('scholarship-results');
     
-    // Search functionality
-    if (searchInput && searchButton) {
-        searchButton.addEventListener('click', function() {
-            filterScholarships();
-        });
+    if (!filterForm || !results) return;
+    
+    function fetchResults(query, append) {
+        results.classList.add('loading');
         
-        searchInput.addEventListener('keyup', function(e) {
-            if (e.key === 'Enter') {
-                filterScholarships();
-            }
-        });
+        return fetch(filterForm.action + '?' + query, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        })
+            .then(response => response.ok ? response.text() : Promise.reject(response.status))
+            .then(html => {
+                if (append) {
+                    const loadMore = results.querySelector('.load-more');
+                    if (loadMore) loadMore.remove();
+                    results.insertAdjacentHTML('beforeend', html);
+                } else {
+                    results.innerHTML = html;
+                    history.replaceState(null, '', filterForm.action + '?' + query);
+                }
+            })
+            .catch(() => showNotification('Could not load scholarships. Please try again.', 'error'))
+            .finally(() => results.classList.remove('loading'));
     }
     
-    // Filter functionality
-    if (categoryFilter && educationFilter) {
-        categoryFilter.addEventListener('change', filterScholarships);
-        educationFilter.addEventListener('change', filterScholarships);
+    function applyFilters() {
+        const params = new URLSearchParams(new FormData(filterForm));
+        fetchResults(params.toString(), false);
     }
     
-    function filterScholarships() {
-        const searchText = searchInput ? searchInput.value.toLowerCase() : '';
-        const categoryValue = categoryFilter ? categoryFilter.value : 'all';
-        const educationValue = educationFilter ? educationFilter.value : 'all';
-        
-        scholarshipCards.forEach(card => {
-            const title = card.querySelector('h3').textContent.toLowerCase();
-            const description = card.querySelector('.description').textContent.toLowerCase();
-            const type = card.getAttribute('data-type');
-            const education = card.getAttribute('data-education');
-            
-            const matchesSearch = searchText === '' || title.includes(searchText) || description.includes(searchText);
-            const matchesCategory = categoryValue === 'all' || type === categoryValue;
-            const matchesEducation = educationValue === 'all' || education === educationValue;
-            
-            if (matchesSearch && matchesCategory && matchesEducation) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        });
-    }
+    filterForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+        applyFilters();
+    });
+    
+    filterForm.querySelectorAll('select, input[type="checkbox"]').forEach(input => {
+        input.addEventListener('change', applyFilters);
+    });
+    
+    filterForm.querySelectorAll('input[type="number"]').forEach(input => {
+        input.addEventListener('input', debounce(applyFilters, 400));
+    });
+    
+    results.addEventListener('click', function(e) {
+        const loadMore = e.target.closest('#load-more');
+        if (!loadMore) return;
+        e.preventDefault();
+        fetchResults(loadMore.dataset.nextQuery, true);
+    });
 }
 
 // Forum interactions
@@ -26,6 +26,9 @@ MIDDLEWARE = [
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'scholarship_app.routers.ReplicaRoutingMiddleware',
+    'scholarship_app.middleware.CurrentStudentMiddleware',
+    'scholarship_app.ratelimit.RateLimitMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -48,13 +51,114 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'vidhyasathi_project.wsgi.application'
+ASGI_APPLICATION = 'vidhyasathi_project.asgi.application'
+
+# Serve home, scholarships, recommendations and the JSON API from their
+# async implementations; only worthwhile under an ASGI server
+ASYNC_VIEWS = os.environ.get('VIDHYASATHI_ASYNC_VIEWS') == '1'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests (seconds); 0 closes after each
+        # request. Under ASGI connections are per thread, so persistence is off
+        'CONN_MAX_AGE': int(os.environ.get('VIDHYASATHI_CONN_MAX_AGE', '0' if ASYNC_VIEWS else '600')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
+# Recommendations and their refresh state, which are rewritten on every
+# rescore, live in their own file; see scholarship_app.routers. Create it with
+# `manage.py migrate --database recommendations`
+RECOMMENDATIONS_DATABASE = 'recommendations'
+DATABASES[RECOMMENDATIONS_DATABASE] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'recommendations.sqlite3',
+}
+
+# Optional read replica: a periodically refreshed copy of the database, see
+# `manage.py snapshot_replica`. Reads on REPLICA_VIEWS use it; a session that
+# writes reads from the primary for REPLICA_STICKY_SECONDS (keep this above
+# the snapshot interval)
+REPLICA_DATABASE = 'replica'
+REPLICA_VIEWS = ('home', 'scholarships', 'api_scholarships', 'forum')
+REPLICA_STICKY_SECONDS = 120
+if os.environ.get('VIDHYASATHI_REPLICA_DB'):
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES['default'],
+        'NAME': os.environ['VIDHYASATHI_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['scholarship_app.routers.RecommendationsRouter', 'scholarship_app.routers.ReplicaRouter']
+
+# Applied to every new SQLite connection by scholarship_app.sqlite. WAL lets
+# readers run alongside a writer; with it synchronous=NORMAL is still safe
+# against application crashes (a power loss may drop the last commits).
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,             # ms to wait for a lock before "database is locked"
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,   # bytes of the file read through the page cache
+    'cache_size': -64 * 1024,         # negative means KiB: 64 MiB per connection
+    'temp_store': 'memory',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vidhyasathi-default',
+    },
+    # Rendered template fragments; keys carry the row version so stale
+    # entries are never read and simply age out
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vidhyasathi-fragments',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Whole rendered pages for anonymous visitors, see scholarship_app.http_cache
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vidhyasathi-pages',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Token buckets per client (account or IP), keyed by URL name; see
+# scholarship_app.ratelimit. rate/period refills, burst is the bucket size
+RATE_LIMITS = {
+    'refresh_recommendations': {'rate': 4, 'period': 60, 'burst': 2},
+    'profile': {'rate': 6, 'period': 60, 'burst': 3, 'methods': ['POST']},
+    'login': {'rate': 10, 'period': 60, 'burst': 5, 'methods': ['POST']},
+}
+RATE_LIMIT_CACHE = 'default'
+
+# Rescoring requests allowed to run at once per process before shedding with 503.
+# Not a global cap: each worker process has its own slots, so size it by
+# dividing the database's write capacity by the number of workers
+SCORING_MAX_IN_FLIGHT = 4
+
+# `manage.py apply_retention` (run daily) archives scholarships this many days
+# after their deadline has passed
+SCHOLARSHIP_ARCHIVE_GRACE_DAYS = 7
+
+# Admin changelists count up to this many rows exactly; larger results use a
+# cached or estimated count, see scholarship_app.pagination.EstimatedCountPaginator
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_COUNT_CACHE_SECONDS = 300
+
+# Recompute jobs (scholarship_app.recompute) are run by `manage.py
+# run_recompute_jobs`, kept running next to the web workers
+RECOMPUTE_BATCH_SIZE = 200      # students per write transaction
+RECOMPUTE_BATCH_PAUSE = 0.05    # seconds between batches, so requests get the write lock
+# A running job with no progress for this long is assumed to have lost its
+# worker and goes back to the queue
+RECOMPUTE_STALE_SECONDS = 600
+
+# Binary scoring catalog written by `manage.py compile_catalog` and mmapped by
+# every worker; rescoring reads it while its catalog version matches the
+# database's and falls back to querying scholarships otherwise
+SCORING_CATALOG_PATH = os.environ.get('VIDHYASATHI_SCORING_CATALOG', os.path.join(BASE_DIR, 'scoring_catalog.bin'))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -80,6 +184,21 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# WebP variants written by `manage.py build_image_variants`
+STATIC_VARIANTS_ROOT = os.path.join(BASE_DIR, 'static_variants')
+if os.path.isdir(STATIC_VARIANTS_ROOT):
+    STATICFILES_DIRS.append(STATIC_VARIANTS_ROOT)
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    # Hashed names plus precompressed copies, written by collectstatic
+    'staticfiles': {
+        'BACKEND': 'scholarship_app.storage.OptimizedStaticFilesStorage',
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 